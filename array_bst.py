@@ -0,0 +1,706 @@
+""" Array-backed Binary Search Tree ADT.
+    Defines a Binary Search Tree which keeps its nodes in parallel arrays
+    instead of linked TreeNode objects: node i has key keys[i], item node_items[i],
+    children left[i] and right[i] (NIL when missing), and subtree_size sizes[i].
+    Child indices, sizes and counts live in typed arrays of machine integers,
+    and keys can too (see key_typecode), so a node costs a few dozen bytes
+    instead of a full object. Freed slots are chained through the left array
+    and reused by later insertions.
+
+    The public interface is the one of BinarySearchTree, so either can be used
+    as the store of ratio.Percentiles. The root and other node arguments are
+    node indices (NIL for an empty subtree), and nodes are handed out as
+    ArrayTreeNode views, which read the arrays on demand and have the
+    attributes of a TreeNode.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from array import array
+from math import log2
+from typing import TypeVar, Generic, Iterable, Iterator
+
+# generic types
+K = TypeVar('K')
+I = TypeVar('I')
+
+NIL = -1
+
+
+class ArrayTreeNode(Generic[K, I]):
+    """ View of one node of an ArrayBinarySearchTree, with the attributes of a TreeNode. """
+
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree: ArrayBinarySearchTree[K, I], index: int) -> None:
+        self.tree = tree
+        self.index = index
+
+    @property
+    def key(self) -> K:
+        return self.tree.keys[self.index]
+
+    @property
+    def item(self) -> I:
+        return self.tree.node_items[self.index]
+
+    @item.setter
+    def item(self, item: I) -> None:
+        self.tree.node_items[self.index] = item
+
+    @property
+    def count(self) -> int:
+        return self.tree.count[self.index]
+
+    @property
+    def subtree_size(self) -> int:
+        return self.tree.sizes[self.index]
+
+    @property
+    def left(self) -> ArrayTreeNode[K, I] | None:
+        return self.tree.node(self.tree.left[self.index])
+
+    @property
+    def right(self) -> ArrayTreeNode[K, I] | None:
+        return self.tree.node(self.tree.right[self.index])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ArrayTreeNode):
+            return NotImplemented
+        return self.tree is other.tree and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    def __str__(self) -> str:
+        return '({0}, {1})'.format(self.key, self.item)
+
+
+class ArrayBinarySearchTree(Generic[K, I]):
+    """ Binary search tree stored in parallel arrays. """
+
+    def __init__(self, multiset: bool = False, key_typecode: str | None = None) -> None:
+        """
+            Initialises an empty tree.
+            If multiset is True, inserting an existing key increments its count.
+            If key_typecode is given (e.g. 'q' or 'd'), keys are stored in a typed
+            array of that type instead of a list of references.
+            :complexity: O(1)
+        """
+        self.multiset = multiset
+        self.key_typecode = key_typecode
+        self.clear()
+
+    def clear(self) -> None:
+        """
+            Removes every key, releasing the arrays.
+            :complexity: O(1)
+        """
+        self.keys = array(self.key_typecode) if self.key_typecode is not None else []
+        self.node_items = []
+        self.left = array('q')
+        self.right = array('q')
+        self.sizes = array('q')
+        self.count = array('q')
+        self.root = NIL
+        self.free = NIL  # head of the free list, chained through self.left
+        self.length = 0
+
+    @classmethod
+    def from_iterable(cls, pairs: Iterable[tuple[K, I]], presorted: bool = False,
+                      multiset: bool = False, key_typecode: str | None = None) -> ArrayBinarySearchTree[K, I]:
+        """
+            Builds a tree from (key, item) pairs, see bulk_load.
+            :complexity: see bulk_load
+        """
+        tree = cls(multiset=multiset, key_typecode=key_typecode)
+        tree.bulk_load(pairs, presorted)
+        return tree
+
+    def is_empty(self) -> bool:
+        """
+            Checks to see if the tree is empty
+            :complexity: O(1)
+        """
+        return self.root == NIL
+
+    def __len__(self) -> int:
+        """ Returns the number of keys in the tree (counting multiplicity in a multiset). """
+
+        return self.length
+
+    def new_node(self, key: K, item: I, count: int = 1) -> int:
+        """
+            Stores a childless node in a free slot (or a new one) and returns its index.
+            :complexity: O(1) amortised
+        """
+        if self.free != NIL:
+            index = self.free
+            self.free = self.left[index]
+            self.keys[index] = key
+            self.node_items[index] = item
+            self.left[index] = NIL
+            self.right[index] = NIL
+            self.sizes[index] = count
+            self.count[index] = count
+        else:
+            index = len(self.node_items)
+            self.keys.append(key)
+            self.node_items.append(item)
+            self.left.append(NIL)
+            self.right.append(NIL)
+            self.sizes.append(count)
+            self.count.append(count)
+        return index
+
+    def release(self, index: int) -> None:
+        """
+            Returns a slot to the free list, dropping its references.
+            :complexity: O(1)
+        """
+        if self.key_typecode is None:
+            self.keys[index] = None
+        self.node_items[index] = None
+        self.left[index] = self.free
+        self.free = index
+
+    def find(self, key: K) -> int:
+        """
+            Returns the index of the node holding key, or NIL if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        keys, left, right = self.keys, self.left, self.right
+        current = self.root
+        while current != NIL:
+            current_key = keys[current]
+            if key == current_key:
+                return current
+            current = left[current] if key < current_key else right[current]
+        return NIL
+
+    def __contains__(self, key: K) -> bool:
+        """
+            Checks to see if the key is in the tree
+            :complexity: see find
+        """
+        return self.find(key) != NIL
+
+    def __getitem__(self, key: K) -> I:
+        """
+            Returns the item stored with key.
+            :complexity: see find
+            :raises KeyError: if the key is not in the tree
+        """
+        index = self.find(key)
+        if index == NIL:
+            raise KeyError('Key not found: {0}'.format(key))
+        return self.node_items[index]
+
+    def get_tree_node_by_key(self, key: K) -> ArrayTreeNode[K, I]:
+        """
+            Returns the node holding key.
+            :complexity: see find
+            :raises KeyError: if the key is not in the tree
+        """
+        index = self.find(key)
+        if index == NIL:
+            raise KeyError('Key not found: {0}'.format(key))
+        return self.node(index)
+
+    def __setitem__(self, key: K, item: I) -> None:
+        """
+            Inserts key with item at the bottom of the tree, incrementing the
+            sizes along the path once the key is known to be new.
+            :complexity: O(CompK * D) where D is the depth of the tree
+            :raises ValueError: if the key is already present and this is not a multiset
+        """
+        keys, left, right = self.keys, self.left, self.right
+        path = []
+        current = self.root
+        while current != NIL:
+            path.append(current)
+            current_key = keys[current]
+            if key < current_key:
+                current = left[current]
+            elif key > current_key:
+                current = right[current]
+            elif self.multiset:
+                self.count[current] += 1
+                break
+            else:
+                raise ValueError('Inserting duplicate item')
+        else:
+            new_index = self.new_node(key, item)
+            if not path:
+                self.root = new_index
+            elif key < keys[path[-1]]:
+                left[path[-1]] = new_index
+            else:
+                right[path[-1]] = new_index
+        for index in path:
+            self.sizes[index] += 1
+        self.length += 1
+
+    def __delitem__(self, key: K) -> None:
+        """
+            Deletes one occurrence of key, replacing a node with two children
+            by its successor.
+            :complexity: O(CompK * D) where D is the depth of the tree
+            :raises ValueError: if the key is not in the tree
+        """
+        keys, left, right, size, count = self.keys, self.left, self.right, self.sizes, self.count
+        path = []
+        target = self.root
+        while target != NIL and key != keys[target]:
+            path.append(target)
+            target = left[target] if key < keys[target] else right[target]
+        if target == NIL:
+            raise ValueError('Deleting non-existent item')
+        self.length -= 1
+        if count[target] > 1:
+            count[target] -= 1
+            path.append(target)
+            for index in path:
+                size[index] -= 1
+            return
+
+        if left[target] != NIL and right[target] != NIL:
+            # copy the successor over and unlink the successor instead,
+            # its whole count moves so sizes up to target lose just one
+            path.append(target)
+            succ_path = []
+            succ = right[target]
+            while left[succ] != NIL:
+                succ_path.append(succ)
+                succ = left[succ]
+            keys[target] = keys[succ]
+            self.node_items[target] = self.node_items[succ]
+            count[target] = count[succ]
+            for index in succ_path:
+                size[index] -= count[succ]
+            path.extend(succ_path)
+            target = succ
+        else:
+            succ_path = []
+
+        replacement = left[target] if left[target] != NIL else right[target]
+        if not path:
+            self.root = replacement
+        elif left[path[-1]] == target:
+            left[path[-1]] = replacement
+        else:
+            right[path[-1]] = replacement
+        for index in path[:len(path) - len(succ_path)]:
+            size[index] -= 1
+        self.release(target)
+
+    def bulk_load(self, pairs: Iterable[tuple[K, I]], presorted: bool = False) -> None:
+        """
+            Replaces the contents of the tree with the given (key, item) pairs,
+            building a perfectly balanced tree in freshly allocated arrays.
+            :complexity: O(n) if presorted, otherwise O(n log n * CompK) for sorting
+            where n is the number of pairs
+            :raises ValueError: if two pairs have the same key (unless this is a multiset)
+        """
+        pairs = list(pairs) if presorted else sorted(pairs, key=lambda pair: pair[0])
+        self.load_sorted(*self.group_runs(pairs))
+
+    def group_runs(self, pairs: list[tuple[K, I]]) -> tuple[list[tuple[K, I]], list[int]]:
+        """
+            Collapses runs of equal keys in sorted pairs into one pair (keeping
+            the first item) and returns the pairs with the length of each run.
+            :complexity: O(n * CompK) where n is the number of pairs
+            :raises ValueError: if a key is repeated and this is not a multiset
+        """
+        grouped, counts = [], []
+        for pair in pairs:
+            if grouped and grouped[-1][0] == pair[0]:
+                if not self.multiset:
+                    raise ValueError('Inserting duplicate item')
+                counts[-1] += 1
+            else:
+                grouped.append(pair)
+                counts.append(1)
+        return grouped, counts
+
+    def load_sorted(self, pairs: list[tuple[K, I]], counts: list[int]) -> None:
+        """
+            Replaces the contents of the tree with pairs of strictly increasing
+            keys, where counts[i] is the multiplicity of pairs[i].
+            :complexity: O(n) where n is the number of pairs
+        """
+        self.clear()
+        self.root = self.build_aux(pairs, counts, 0, len(pairs))
+        self.length = sum(counts)
+
+    def insert_many(self, pairs: Iterable[tuple[K, I]], presorted: bool = False) -> None:
+        """
+            Inserts a batch of (key, item) pairs, see BinarySearchTree.insert_many.
+            :complexity: O(k log k * CompK) for sorting plus the smaller of
+            O(n + k) for the rebuild and O(k * D * CompK) for single insertions
+            where k is the size of the batch, n the size of the tree and D its depth
+            :raises ValueError: if a key is already in the tree or repeated in the batch
+        """
+        batch = list(pairs) if presorted else sorted(pairs, key=lambda pair: pair[0])
+        batch, batch_counts = self.group_runs(batch)
+
+        if len(batch) * log2(self.length + 2) < self.length:
+            if not self.multiset and any(key in self for key, _ in batch):
+                raise ValueError('Inserting duplicate item')
+            for (key, item), count in zip(batch, batch_counts):
+                for _ in range(count):
+                    self[key] = item
+            return
+
+        merged, counts = [], []
+        existing = self.iter_indices()
+        current = next(existing, NIL)
+        for pair, count in zip(batch, batch_counts):
+            while current != NIL and self.keys[current] < pair[0]:
+                merged.append((self.keys[current], self.node_items[current]))
+                counts.append(self.count[current])
+                current = next(existing, NIL)
+            if current != NIL and self.keys[current] == pair[0]:
+                if not self.multiset:
+                    raise ValueError('Inserting duplicate item')
+                pair = (self.keys[current], self.node_items[current])
+                count += self.count[current]
+                current = next(existing, NIL)
+            merged.append(pair)
+            counts.append(count)
+        while current != NIL:
+            merged.append((self.keys[current], self.node_items[current]))
+            counts.append(self.count[current])
+            current = next(existing, NIL)
+        self.load_sorted(merged, counts)
+
+    def delete_many(self, keys: Iterable[K], presorted: bool = False) -> None:
+        """
+            Deletes a batch of keys (one occurrence per key in the batch), see
+            BinarySearchTree.delete_many.
+            Nothing is deleted if any key has fewer occurrences than in the batch.
+            :complexity: see insert_many
+            :raises ValueError: if a key is not in the tree (often enough)
+        """
+        batch = list(keys) if presorted else sorted(keys)
+        runs = []
+        for key in batch:
+            if runs and runs[-1][0] == key:
+                runs[-1][1] += 1
+            else:
+                runs.append([key, 1])
+
+        if len(runs) * log2(self.length + 2) < self.length:
+            for key, count in runs:
+                index = self.find(key)
+                if index == NIL or self.count[index] < count:
+                    raise ValueError('Deleting non-existent item')
+            for key, count in runs:
+                for _ in range(count):
+                    del self[key]
+            return
+
+        kept, counts = [], []
+        i = 0
+        for current in self.iter_indices():
+            count = self.count[current]
+            if i < len(runs) and self.keys[current] == runs[i][0]:
+                count -= runs[i][1]
+                i += 1
+                if count < 0:
+                    raise ValueError('Deleting non-existent item')
+            if count > 0:
+                kept.append((self.keys[current], self.node_items[current]))
+                counts.append(count)
+        if i < len(runs):
+            raise ValueError('Deleting non-existent item')
+        self.load_sorted(kept, counts)
+
+    def build_aux(self, pairs: list[tuple[K, I]], counts: list[int], lo: int, hi: int) -> int:
+        """
+            Builds a balanced subtree holding pairs[lo:hi] and returns the index of its root.
+            :complexity: O(hi - lo)
+        """
+        if lo >= hi:
+            return NIL
+        mid = (lo + hi) // 2
+        key, item = pairs[mid]
+        current = self.new_node(key, item, counts[mid])
+        left = self.build_aux(pairs, counts, lo, mid)
+        right = self.build_aux(pairs, counts, mid + 1, hi)
+        self.left[current] = left
+        self.right[current] = right
+        self.sizes[current] += (self.sizes[left] if left != NIL else 0) + (self.sizes[right] if right != NIL else 0)
+        return current
+
+    def node(self, index: int) -> ArrayTreeNode[K, I] | None:
+        """
+            Returns a view of the node at index, or None for NIL.
+            :complexity: O(1)
+        """
+        return ArrayTreeNode(self, index) if index != NIL else None
+
+    def index_of(self, current: ArrayTreeNode[K, I] | int | None) -> int:
+        """
+            Returns the index of a node given as a view or an index (NIL for None).
+            :complexity: O(1)
+        """
+        if current is None:
+            return NIL
+        return current.index if isinstance(current, ArrayTreeNode) else current
+
+    def size(self, current: ArrayTreeNode[K, I] | int | None) -> int:
+        """ Number of keys in a (possibly empty) subtree, counting multiplicity. """
+
+        index = self.index_of(current)
+        return self.sizes[index] if index != NIL else 0
+
+    def get_minimal(self, current: ArrayTreeNode[K, I] | int) -> ArrayTreeNode[K, I]:
+        """
+            Get a node having the smallest key in the current sub-tree.
+            :complexity: O(D) where D is the depth of the subtree
+        """
+        index = self.index_of(current)
+        while self.left[index] != NIL:
+            index = self.left[index]
+        return self.node(index)
+
+    def get_successor(self, current: ArrayTreeNode[K, I] | int) -> ArrayTreeNode[K, I] | None:
+        """
+            Get the node with the smallest key in the right subtree of current
+            (None if it has no right child).
+            :complexity: O(D) where D is the depth of the subtree
+        """
+        right = self.right[self.index_of(current)]
+        return self.get_minimal(right) if right != NIL else None
+
+    def is_leaf(self, current: ArrayTreeNode[K, I] | int) -> bool:
+        """ Simple check whether or not the node is a leaf. """
+
+        index = self.index_of(current)
+        return self.left[index] == NIL and self.right[index] == NIL
+
+    def left_spine(self, current: int, stack: list[int] | None = None) -> list[int]:
+        """
+            Pushes the index current and its chain of left descendants onto the stack.
+            :complexity: O(D) where D is the depth of the subtree
+        """
+        if stack is None:
+            stack = []
+        left = self.left
+        while current != NIL:
+            stack.append(current)
+            current = left[current]
+        return stack
+
+    def iter_stack(self, stack: list[int]) -> Iterator[int]:
+        """
+            Lazily continues an in-order walk from a stack of pending indices,
+            where the top of the stack is the next node to visit.
+            :complexity: O(1) amortised per node
+        """
+        right = self.right
+        while stack:
+            current = stack.pop()
+            yield current
+            self.left_spine(right[current], stack)
+
+    def iter_indices(self) -> Iterator[int]:
+        """
+            Lazily iterates over the node indices in increasing key order.
+            :complexity: O(1) amortised per node, O(D) extra space
+        """
+        return self.iter_stack(self.left_spine(self.root))
+
+    def iter_nodes(self, stack: list[int]) -> Iterator[ArrayTreeNode[K, I]]:
+        """
+            Lazily continues an in-order walk from a stack of pending indices,
+            producing node views.
+            :complexity: O(1) amortised per node
+        """
+        for current in self.iter_stack(stack):
+            yield ArrayTreeNode(self, current)
+
+    def __iter__(self) -> Iterator[K]:
+        """
+            Lazily iterates over the keys in increasing order (once each, even
+            in a multiset).
+            :complexity: see iter_indices
+        """
+        for index in self.iter_indices():
+            yield self.keys[index]
+
+    def items(self) -> Iterator[tuple[K, I]]:
+        """
+            Lazily iterates over the (key, item) pairs in increasing key order.
+            :complexity: see iter_indices
+        """
+        for index in self.iter_indices():
+            yield self.keys[index], self.node_items[index]
+
+    def range(self, lo: K, hi: K) -> Iterator[tuple[K, I]]:
+        """
+            Lazily iterates over the (key, item) pairs with lo <= key < hi in
+            increasing key order. Subtrees entirely below lo are never visited.
+            :complexity: O(CompK * (D + m)) where m is the number of pairs returned
+        """
+        keys = self.keys
+        stack = []
+        current = self.root
+        while current != NIL:  # stack the ancestors which are >= lo
+            if keys[current] < lo:
+                current = self.right[current]
+            else:
+                stack.append(current)
+                current = self.left[current]
+        for index in self.iter_stack(stack):
+            if not keys[index] < hi:
+                return
+            yield keys[index], self.node_items[index]
+
+    def select_path(self, k: int) -> tuple[list[int], int]:
+        """
+            Returns the in-order stack of indices whose top is the node holding the
+            kth smallest key (k counts from 1), together with the number of
+            occurrences of that key which rank before k.
+            :complexity: O(D) where D is the depth of the tree
+        """
+        left, size, count = self.left, self.sizes, self.count
+        stack = []
+        current = self.root
+        while current != NIL:
+            left_size = size[left[current]] if left[current] != NIL else 0
+            if k <= left_size:
+                stack.append(current)
+                current = left[current]
+            elif k <= left_size + count[current]:
+                stack.append(current)
+                return stack, k - left_size - 1
+            else:
+                k -= left_size + count[current]
+                current = self.right[current]
+        return stack, 0
+
+    def iter_from_rank(self, k: int) -> Iterator[ArrayTreeNode[K, I]]:
+        """
+            Lazily iterates over the nodes in increasing key order, starting
+            from the one holding the kth smallest key (k counts from 1).
+            :complexity: O(D) to start, then O(1) amortised per node
+        """
+        stack, _ = self.select_path(k)
+        return self.iter_nodes(stack)
+
+    def iter_keys_from_rank(self, k: int) -> Iterator[K]:
+        """
+            Lazily iterates over the keys in increasing order, starting from the
+            kth smallest one and repeating each key as many times as it occurs.
+            :complexity: O(D) to start, then O(1) amortised per key
+        """
+        stack, skip = self.select_path(k)
+        for current in self.iter_stack(stack):
+            for _ in range(self.count[current] - skip):
+                yield self.keys[current]
+            skip = 0
+
+    def floor(self, key: K) -> ArrayTreeNode[K, I] | None:
+        """
+            Returns the node with the largest key <= key, or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = NIL
+        current = self.root
+        while current != NIL:
+            if key < self.keys[current]:
+                current = self.left[current]
+            elif key == self.keys[current]:
+                return self.node(current)
+            else:
+                best = current
+                current = self.right[current]
+        return self.node(best)
+
+    def ceiling(self, key: K) -> ArrayTreeNode[K, I] | None:
+        """
+            Returns the node with the smallest key >= key, or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = NIL
+        current = self.root
+        while current != NIL:
+            if self.keys[current] < key:
+                current = self.right[current]
+            elif key == self.keys[current]:
+                return self.node(current)
+            else:
+                best = current
+                current = self.left[current]
+        return self.node(best)
+
+    def predecessor(self, key: K) -> ArrayTreeNode[K, I] | None:
+        """
+            Returns the node with the largest key strictly smaller than key
+            (which need not be in the tree), or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = NIL
+        current = self.root
+        while current != NIL:
+            if self.keys[current] < key:
+                best = current
+                current = self.right[current]
+            else:
+                current = self.left[current]
+        return self.node(best)
+
+    def successor(self, key: K) -> ArrayTreeNode[K, I] | None:
+        """
+            Returns the node with the smallest key strictly larger than key
+            (which need not be in the tree), or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = NIL
+        current = self.root
+        while current != NIL:
+            if key < self.keys[current]:
+                best = current
+                current = self.left[current]
+            else:
+                current = self.right[current]
+        return self.node(best)
+
+    def rank(self, key: K) -> int:
+        """
+            Returns the number of keys strictly smaller than key (counting multiplicity).
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        left, size = self.left, self.sizes
+        rank = 0
+        current = self.root
+        while current != NIL:
+            if self.keys[current] < key:
+                rank += (size[left[current]] if left[current] != NIL else 0) + self.count[current]
+                current = self.right[current]
+            else:
+                current = left[current]
+        return rank
+
+    def kth_smallest(self, k: int, current: ArrayTreeNode[K, I] | int | None) -> ArrayTreeNode[K, I] | None:
+        """
+            Returns the node holding the kth smallest key (k counts from 1) in the
+            subtree rooted at current, or None if k is out of range.
+            :complexity: O(D) where D is the depth of the subtree
+        """
+        left, size, count = self.left, self.sizes, self.count
+        current = self.index_of(current)
+        while current != NIL:
+            left_size = size[left[current]] if left[current] != NIL else 0
+            if k <= left_size:
+                current = left[current]
+            elif k <= left_size + count[current]:
+                return self.node(current)
+            else:
+                k -= left_size + count[current]
+                current = self.right[current]
+        return None
@@ -0,0 +1,102 @@
+""" AVL Tree ADT.
+    Defines a self-balancing Binary Search Tree with linked nodes.
+    Each node keeps its height so that every insertion and deletion can
+    restore the AVL property with rotations, while keeping subtree_size
+    correct for order-statistic queries such as kth_smallest.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from typing import TypeVar
+from bst import BinarySearchTree
+from node import AVLTreeNode
+
+# generic types
+K = TypeVar('K')
+I = TypeVar('I')
+
+
+class AVLTree(BinarySearchTree[K, I]):
+    """ Binary search tree which rebalances itself after every update. """
+
+    node_type = AVLTreeNode
+
+    def height(self, current: AVLTreeNode | None) -> int:
+        """ Height of a (possibly empty) subtree. """
+
+        return current.height if current is not None else 0
+
+    def update(self, current: AVLTreeNode) -> None:
+        """
+            Recomputes height and subtree_size of current from its children.
+            :complexity: O(1)
+        """
+        current.height = 1 + max(self.height(current.left), self.height(current.right))
+        current.subtree_size = current.count + self.size(current.left) + self.size(current.right)
+
+    def balance_factor(self, current: AVLTreeNode) -> int:
+        """ Height of the left subtree minus the height of the right subtree. """
+
+        return self.height(current.left) - self.height(current.right)
+
+    def rotate_left(self, current: AVLTreeNode) -> AVLTreeNode:
+        """
+            Rotates the subtree rooted at current to the left and returns its new root.
+            :complexity: O(1)
+        """
+        new_root = current.right
+        current.right = new_root.left
+        new_root.left = current
+        self.update(current)
+        self.update(new_root)
+        return new_root
+
+    def rotate_right(self, current: AVLTreeNode) -> AVLTreeNode:
+        """
+            Rotates the subtree rooted at current to the right and returns its new root.
+            :complexity: O(1)
+        """
+        new_root = current.left
+        current.left = new_root.right
+        new_root.right = current
+        self.update(current)
+        self.update(new_root)
+        return new_root
+
+    def rebalance(self, current: AVLTreeNode) -> AVLTreeNode:
+        """
+            Restores the AVL property at current (whose children are already
+            balanced) and returns the root of the resulting subtree.
+            :complexity: O(1)
+        """
+        self.update(current)
+        balance = self.balance_factor(current)
+        if balance > 1:
+            if self.balance_factor(current.left) < 0:
+                current.left = self.rotate_left(current.left)
+            return self.rotate_right(current)
+        if balance < -1:
+            if self.balance_factor(current.right) > 0:
+                current.right = self.rotate_right(current.right)
+            return self.rotate_left(current)
+        return current
+
+    def retrace(self, path: list[AVLTreeNode]) -> AVLTreeNode:
+        """
+            Rebalances every node on a root-to-parent path, bottom-up, after an
+            insertion or deletion below it, relinking rotated subtrees into
+            their parents. Returns the new root of the subtree the path starts at.
+            :complexity: O(len(path)) which is O(log n)
+        """
+        for i in range(len(path) - 1, 0, -1):
+            node = path[i]
+            new_node = self.rebalance(node)
+            if new_node is not node:
+                parent = path[i - 1]
+                if parent.left is node:
+                    parent.left = new_node
+                else:
+                    parent.right = new_node
+        return self.rebalance(path[0])
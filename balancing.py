@@ -1,76 +1,107 @@
 from __future__ import annotations
+from typing import TypeVar
 from threedeebeetree import Point
-import random
 
 from threedeebeetree import ThreeDeeBeeTree, BeeNode
-from ratio import Percentiles
-
-def make_ordering(my_coordinate_list: list[Point]) -> list[Point]:
-    """
-
-    Complexity :
-
-    Best case = Worst case : The nested loops in make_ordering_rec are executed for each point in the input list. 
-                             This operation leads to a cubic time complexity of O(n^3). Adding points to the Percentiles 
-                             object contributes a complexity of O(n log n) since each insertion into a Binary Search Tree is 
-                             O(log n) and this operation is repeated n times. The ratio calculation function traverses through 
-                             all nodes of the binary tree, giving a time complexity of O(n). Therefore, adding up all these 
-                             operations, the total time complexity of the make_ordering function is O(n^3) + O(n log n) + O(n). 
-                             However, as n grows large, the terms O(n log n) and O(n) become insignificant relative to the cubic 
-                             term. So, it is common to represent the overall time complexity using the term with the highest order 
-                             of magnitude, which in this case is O(n^3).
-
-                             ( yes yes i know O(n^3) is insane )
 
+I = TypeVar('I')
 
+def build_balanced(points: list[Point], items: list[I] | None = None) -> BeeNode | None:
     """
-    def make_ordering_rec(order : list[Point]) -> tuple[float,float,float]:
-        n = len(order)
-        score = []
-        number_of_points=3
-        for i in range(number_of_points):
-            left = [0] * number_of_points
-            right = [0] * number_of_points
-            for j in range(number_of_points):
-                if i==j:
-                    continue
-                if order[j] < order[i]:
-                    left[i]+=1
-                else:
-                    right[i]+=1
-            final_score = []
-            for _ in range(number_of_points):
-                if min(left[i] , right[i]) > 17:
-                    final_score.append(min(left[i] , right[i]) / max(left[i] , right[i]))
-                if not final_score:
-                    score.append(1.0)
-                else:
-                    score.append(min(final_score))
-            return tuple(score)
-    best = (float('inf') , float('inf') , float('inf'))
-    for compute in my_coordinate_list:
-        new_score = make_ordering_rec(compute)
-        if new_score < best:
-            best = new_score
-    
-    ratio = Percentiles()
-    for p in my_coordinate_list:
-        ratio.add_point(p)
-
-    my_coordinate_list = ratio.ratio(0,0)
-
-    return my_coordinate_list[0:7]
-
-
-        
+    Builds a detached 3D tree holding the given (distinct) points, where items[i] is the item
+    of points[i] (None if items is not given), and returns its root.
 
+    Every node is the point of its region which is closest to the median on all three axes at
+    once: the one maximising, over the axes, the smaller of the number of points below it and the
+    number of points at or above it. Axes on which the whole region shares one coordinate are left
+    out, so flat or collinear points are still split at the median of the axes they spread over.
+    For points in general position this keeps both sides of every axis within the 1:7 ratio
+    measured by the balancing tests.
 
+    Each point is sorted once per axis up front. A region then finds the ranks of its points from
+    its three sorted lists, picks its split point and hands each octant its share of the lists,
+    still sorted, so no region ever sorts again.
 
+    Complexity :
 
+    Best case = Worst case : O(n log n) for the initial sorts, plus O(m) for a region of m points.
+                             Each level of the tree splits the points into disjoint regions, so each
+                             level costs O(n), and with balanced splits there are O(log n) levels,
+                             giving O(n log n) overall.
+    """
+    n = len(points)
+    if n == 0:
+        return None
+    by_axis = [sorted(range(n), key=lambda i, axis=axis: points[i][axis]) for axis in range(3)]
+    below = [[0] * n for _ in range(3)]  # per axis, points of the region strictly below point i
+
+    root = None
+    stack = [(by_axis, None, 0)]  # (sorted lists of a region, parent node, octant of the parent)
+    while stack:
+        region, parent, octant = stack.pop()
+        m = len(region[0])
+        for axis in range(3):
+            ranks = below[axis]
+            previous = None
+            for position, i in enumerate(region[axis]):
+                value = points[i][axis]
+                ranks[i] = position if value != previous else ranks[region[axis][position - 1]]
+                previous = value
+
+        # an axis on which every point of the region has the same coordinate cannot be split,
+        # so it is left out of the scores (the points are distinct, so some axis has spread)
+        axes = [axis for axis in range(3)
+                if points[region[axis][0]][axis] != points[region[axis][-1]][axis]] or [0, 1, 2]
+        split, best = region[0][0], -1
+        for i in region[0]:
+            score = min(min(below[axis][i], m - 1 - below[axis][i]) for axis in axes)
+            if score > best:
+                split, best = i, score
+
+        node = BeeNode(points[split], items[split] if items is not None else None, subtree_size=m)
+        if parent is None:
+            root = node
+        else:
+            parent.set_child(octant, node)
+
+        octants = [node.get_octant_index(points[i]) if i != split else -1 for i in region[0]]
+        octant_of = dict(zip(region[0], octants))
+        children = [[[], [], []] for _ in range(8)]
+        for axis in range(3):
+            for i in region[axis]:
+                if i != split:
+                    children[octant_of[i]][axis].append(i)
+        for child_octant in range(8):
+            if children[child_octant][0]:
+                stack.append((children[child_octant], node, child_octant))
+    return root
 
+def make_ordering(my_coordinate_list: list[Point]) -> list[Point]:
+    """
+    Returns the points in an order which, inserted one by one into an empty ThreeDeeBeeTree,
+    gives the tree built by build_balanced: its nodes in pre-order, so every split point is
+    inserted before the points of its octants. Repeated points are only listed once.
 
+    Complexity :
 
+    Best case = Worst case : O(n log n), see build_balanced, plus O(n) to list the nodes.
+    """
+    tree = make_tree(my_coordinate_list)
+    return [node.key for node in tree.iter_subtree(tree.root)]
 
+def make_tree(my_coordinate_list: list[Point], items: list[I] | None = None) -> ThreeDeeBeeTree[I]:
+    """
+    Returns a ThreeDeeBeeTree holding the points, built directly by build_balanced, where items[i]
+    is the item of the ith point (None if items is not given). For a repeated point the item of
+    its last occurrence is kept, as with repeated insertion.
 
+    Complexity :
 
-    
+    Best case = Worst case : O(n log n), see build_balanced.
+    """
+    last = {point: i for i, point in enumerate(my_coordinate_list)}
+    points = list(last)
+    tree = ThreeDeeBeeTree()
+    tree.root = build_balanced(points, [items[i] for i in last.values()] if items is not None else None)
+    tree.length = len(points)
+    return tree
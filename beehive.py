@@ -1,5 +1,6 @@
+from __future__ import annotations
 from dataclasses import dataclass
-from heap import MaxHeap
+from heap import IndexedMaxHeap
 
 @dataclass
 class Beehive:
@@ -54,22 +55,23 @@ class Beehive:
 
 class BeehiveSelector:
 
-    def __init__(self, max_beehives: int):
-        self.beehives = MaxHeap(max_beehives)
+    def __init__(self, max_beehives: int = 0):
+        """ max_beehives is only the initial capacity, the selector grows as hives are added. """
+        self.beehives = IndexedMaxHeap(max_beehives, key=Beehive.product)
 
     def set_all_beehives(self, hive_list: list[Beehive]):
         """
+        Replaces the hives of the selector with hive_list, keeping room for at least as many
+        hives as before.
+
         Complexity :
 
-        Best case  = Worst case : O(n log n) - This is when the add operation always results in a rise to the root of the MaxHeap 
-                    (thus maximizing the number of operations).
-        
+        Best case  = Worst case : O(n) - The hives are written into the MaxHeap as they come and then heapified,
+                    where sinking the hives with a child costs O(n) in total (see MaxHeap.heapify).
+
         """
+        self.beehives = IndexedMaxHeap.from_iterable(hive_list, self.beehives.capacity(), key=Beehive.product)
 
-        self.beehives = MaxHeap(len(self.beehives.the_array)) #python will clear the memory of the old one later
-        for i in len(hive_list):
-            self.beehives.add(i)
-    
     def add_beehive(self, hive: Beehive):
         """
         Complexity :
@@ -80,25 +82,106 @@ class BeehiveSelector:
         """
         self.beehives.add(hive)
     
+    def update_beehive(self, hive: Beehive, volume: int | None = None, capacity: int | None = None,
+                       nutrient_factor: int | None = None) -> None:
+        """
+        Changes the given stats of a hive already in the selector (the others are kept)
+        and moves it to its new place, whether its product went up or down.
+
+        Raises KeyError if the hive is not in the selector.
+
+        Complexity :
+
+        Best case : O(1) - This is when the hive keeps its place after one comparison each way.
+
+        Worst case : O(log n) - This is when the hive rises to the root or sinks to a leaf of the MaxHeap.
+        """
+        if hive not in self.beehives:
+            raise KeyError(hive)
+        if volume is not None:
+            hive.volume = volume
+        if capacity is not None:
+            hive.capacity = capacity
+        if nutrient_factor is not None:
+            hive.nutrient_factor = nutrient_factor
+        self.beehives.update(hive)
+
+    def remove_beehive(self, hive: Beehive) -> None:
+        """
+        Removes a hive from the selector, moving the last hive of the MaxHeap into its place.
+
+        Raises KeyError if the hive is not in the selector.
+
+        Complexity :
+
+        Best case : O(1) - This is when the hive is the last one in the MaxHeap, or the hive moved into its place stays there.
+
+        Worst case : O(log n) - This is when the hive moved into its place rises to the root or sinks to a leaf.
+        """
+        self.beehives.remove(hive)
+
     def harvest_best_beehive(self) -> int:   
         """
+        Harvests the hive with the largest product, which stays at the root of the MaxHeap
+        and is then sunk to its new place.
+
+        Raises IndexError if there are no hives.
+
         Complexity :
 
-        Best case : O(log n) - This is when the get_max and add operations execute as efficiently as possible, 
-                    meaning they don't have to perform the maximum number of possible comparisons and swaps. This 
-                    happens when the heap property is maintained with minimal adjustments.
+        Best case : O(1) - This is when the hive still has the largest product after the harvest,
+                    so it stays at the root after comparing it with its children once.
         
-        Worst case : O(log n) - This is when the get_max and add operations have to perform the maximum number of comparisons 
-                     and swaps. This happens when the heap property requires the most adjustments, such as when the element that 
-                     is removed is the root and when the element that is added rises all the way to the root.
+        Worst case : O(log n) - This is when the hive sinks all the way down to a leaf of the MaxHeap.
         
         """     
-        current_max = self.beehives.get_max()
+        current_max = self.beehives.peek_max()
         if current_max.volume >=  current_max.capacity:
             emeralds = current_max.nutrient_factor * current_max.capacity
             current_max.volume = current_max.volume - current_max.capacity
         else:
             emeralds = current_max.nutrient_factor * current_max.volume
             current_max.volume = 0
-        self.beehives.add(current_max)
-        return emeralds
\ No newline at end of file
+        self.beehives.update(current_max)
+        return emeralds
+
+    def harvest_many(self, rounds: int, log: list[tuple[Beehive, int, int]] | None = None) -> int:
+        """
+        Harvests the best hive rounds times, as harvest_best_beehive would, and returns the total
+        emeralds. If log is given, every run of rounds harvesting the same hive is appended to it
+        as (hive, number of rounds, emeralds per round).
+
+        While the best hive holds at least its capacity, each harvest takes the same nutrient_factor
+        * capacity, which is its product, and only lowers its own volume. The other hives are
+        unchanged, so it stays the best for all volume // capacity of those rounds, which are
+        taken in one step. The round after them empties the hive. This holds even when its product
+        is 0 (a nutrient_factor of 0 still drains the volume, for no emeralds). Once the best hive
+        has no volume or no capacity, no harvest changes anything and it stays the best, so the
+        remaining rounds (worth 0) are skipped and not logged, as they are when there are no hives.
+
+        Complexity :
+
+        Best case : O(1) - This is when the best hive can be harvested for all the rounds at its capacity.
+
+        Worst case : O(r log n) where r is the number of runs, which is at most 2 per leader, as each
+                     run ends with the hive sinking to its new place in the MaxHeap.
+        """
+        total = 0
+        while rounds > 0 and len(self.beehives) > 0:
+            best = self.beehives.peek_max()
+            if best.volume == 0 or best.capacity == 0:
+                break
+            if best.volume >= best.capacity:
+                taken = min(best.volume // best.capacity, rounds)
+                emeralds = best.nutrient_factor * best.capacity
+                best.volume -= taken * best.capacity
+            else:
+                taken = 1
+                emeralds = best.nutrient_factor * best.volume
+                best.volume = 0
+            self.beehives.update(best)
+            total += taken * emeralds
+            rounds -= taken
+            if log is not None:
+                log.append((best, taken, emeralds))
+        return total
@@ -8,8 +8,9 @@ from __future__ import annotations
 __author__ = 'Brendon Taylor, modified by Alexey Ignatiev, further modified by Jackson Goerner'
 __docformat__ = 'reStructuredText'
 
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Iterable, Iterator
 from node import TreeNode
+from math import log2
 import sys
 
 
@@ -22,14 +23,177 @@ T = TypeVar('T')
 class BinarySearchTree(Generic[K, I]):
     """ Basic binary search tree. """
 
-    def __init__(self) -> None:
+    node_type = TreeNode
+
+    def __init__(self, multiset: bool = False) -> None:
         """
             Initialises an empty Binary Search Tree
+            If multiset is True, inserting an existing key increments the count
+            of its node instead of raising, and subtree_size counts multiplicity.
             :complexity: O(1)
         """
 
         self.root = None
         self.length = 0
+        self.multiset = multiset
+
+    @classmethod
+    def from_iterable(cls, pairs: Iterable[tuple[K, I]], presorted: bool = False,
+                      multiset: bool = False) -> BinarySearchTree[K, I]:
+        """
+            Builds a tree from (key, item) pairs, see bulk_load.
+            :complexity: see bulk_load
+        """
+        tree = cls(multiset=multiset)
+        tree.bulk_load(pairs, presorted)
+        return tree
+
+    def bulk_load(self, pairs: Iterable[tuple[K, I]], presorted: bool = False) -> None:
+        """
+            Replaces the contents of the tree with the given (key, item) pairs,
+            building a perfectly balanced tree with correct subtree sizes.
+            If presorted is True the pairs must already be in increasing key order.
+            :complexity: O(n) if presorted, otherwise O(n log n * CompK) for sorting
+            where n is the number of pairs
+            CompK is the complexity of comparing the keys
+            :raises ValueError: if two pairs have the same key (unless this is a multiset)
+        """
+        pairs = list(pairs) if presorted else sorted(pairs, key=lambda pair: pair[0])
+        self.load_sorted(*self.group_runs(pairs))
+
+    def group_runs(self, pairs: list[tuple[K, I]]) -> tuple[list[tuple[K, I]], list[int]]:
+        """
+            Collapses runs of equal keys in sorted pairs into one pair (keeping
+            the first item) and returns the pairs with the length of each run.
+            :complexity: O(n * CompK) where n is the number of pairs
+            :raises ValueError: if a key is repeated and this is not a multiset
+        """
+        grouped, counts = [], []
+        for pair in pairs:
+            if grouped and grouped[-1][0] == pair[0]:
+                if not self.multiset:
+                    raise ValueError('Inserting duplicate item')
+                counts[-1] += 1
+            else:
+                grouped.append(pair)
+                counts.append(1)
+        return grouped, counts
+
+    def load_sorted(self, pairs: list[tuple[K, I]], counts: list[int]) -> None:
+        """
+            Replaces the contents of the tree with pairs of strictly increasing
+            keys, where counts[i] is the multiplicity of pairs[i].
+            :complexity: O(n) where n is the number of pairs
+        """
+        self.root = self.build_aux(pairs, counts, 0, len(pairs))
+        self.length = sum(counts)
+
+    def insert_many(self, pairs: Iterable[tuple[K, I]], presorted: bool = False) -> None:
+        """
+            Inserts a batch of (key, item) pairs. The batch is sorted once; when it is
+            large relative to the tree it is merged with the existing pairs and the tree
+            is rebuilt balanced in one pass, otherwise the pairs are inserted one by one.
+            Unless this is a multiset, nothing is inserted if any key is already present
+            or repeated.
+            :complexity: O(k log k * CompK) for sorting plus the smaller of
+            O(n + k) for the rebuild and O(k * D * CompK) for single insertions
+            where k is the size of the batch, n the size of the tree and D its depth
+            CompK is the complexity of comparing the keys
+            :raises ValueError: if a key is already in the tree or repeated in the batch
+        """
+        batch = list(pairs) if presorted else sorted(pairs, key=lambda pair: pair[0])
+        batch, batch_counts = self.group_runs(batch)
+
+        if len(batch) * log2(self.length + 2) < self.length:
+            if not self.multiset and any(key in self for key, _ in batch):
+                raise ValueError('Inserting duplicate item')
+            for (key, item), count in zip(batch, batch_counts):
+                for _ in range(count):
+                    self[key] = item
+            return
+
+        merged, counts = [], []
+        existing = self.iter_nodes(self.left_spine(self.root))
+        current = next(existing, None)
+        for pair, count in zip(batch, batch_counts):
+            while current is not None and current.key < pair[0]:
+                merged.append((current.key, current.item))
+                counts.append(current.count)
+                current = next(existing, None)
+            if current is not None and current.key == pair[0]:
+                if not self.multiset:
+                    raise ValueError('Inserting duplicate item')
+                pair = (current.key, current.item)
+                count += current.count
+                current = next(existing, None)
+            merged.append(pair)
+            counts.append(count)
+        while current is not None:
+            merged.append((current.key, current.item))
+            counts.append(current.count)
+            current = next(existing, None)
+        self.load_sorted(merged, counts)
+
+    def delete_many(self, keys: Iterable[K], presorted: bool = False) -> None:
+        """
+            Deletes a batch of keys (one occurrence per key in the batch), merging them
+            against the existing keys and rebuilding the tree when the batch is large
+            relative to the tree, or deleting them one by one otherwise.
+            Nothing is deleted if any key has fewer occurrences than in the batch.
+            :complexity: see insert_many
+            :raises ValueError: if a key is not in the tree (often enough)
+        """
+        batch = list(keys) if presorted else sorted(keys)
+        runs = []
+        for key in batch:
+            if runs and runs[-1][0] == key:
+                runs[-1][1] += 1
+            else:
+                runs.append([key, 1])
+
+        if len(runs) * log2(self.length + 2) < self.length:
+            for key, count in runs:
+                try:
+                    found = self.get_tree_node_by_key(key)
+                except KeyError:
+                    raise ValueError('Deleting non-existent item')
+                if found.count < count:
+                    raise ValueError('Deleting non-existent item')
+            for key, count in runs:
+                for _ in range(count):
+                    del self[key]
+            return
+
+        kept, counts = [], []
+        i = 0
+        for current in self.iter_nodes(self.left_spine(self.root)):
+            count = current.count
+            if i < len(runs) and current.key == runs[i][0]:
+                count -= runs[i][1]
+                i += 1
+                if count < 0:
+                    raise ValueError('Deleting non-existent item')
+            if count > 0:
+                kept.append((current.key, current.item))
+                counts.append(count)
+        if i < len(runs):
+            raise ValueError('Deleting non-existent item')
+        self.load_sorted(kept, counts)
+
+    def build_aux(self, pairs: list[tuple[K, I]], counts: list[int], lo: int, hi: int) -> TreeNode | None:
+        """
+            Builds a balanced subtree holding pairs[lo:hi] around its middle pair.
+            :complexity: O(hi - lo)
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        key, item = pairs[mid]
+        current = self.node_type(key, item=item, count=counts[mid])
+        current.left = self.build_aux(pairs, counts, lo, mid)
+        current.right = self.build_aux(pairs, counts, mid + 1, hi)
+        self.update(current)
+        return current
 
     def is_empty(self) -> bool:
         """
@@ -39,7 +203,7 @@ class BinarySearchTree(Generic[K, I]):
         return self.root is None
 
     def __len__(self) -> int:
-        """ Returns the number of nodes in the tree. """
+        """ Returns the number of keys in the tree (counting multiplicity in a multiset). """
 
         return self.length
 
@@ -87,7 +251,7 @@ class BinarySearchTree(Generic[K, I]):
         Best case : The best case scenario is when the key is found at the node 
                     which the function starts its search from (it's the 'current' node passed as an 
                     argument to the function). This would mean the key was found immediately without
-                    any further recursive calls. Hence, in the best case, the time complexity is O(1).
+                    descending any further. Hence, in the best case, the time complexity is O(1).
         
         Worst case : The worst case scenario is similar to get_tree_node_by_key when the tree is skewed. 
                      If the key is located at one of the leaf nodes, the function would have to traverse 
@@ -96,14 +260,14 @@ class BinarySearchTree(Generic[K, I]):
         
         """
 
-        if current is None:
-            raise KeyError('Key not found: {0}'.format(key))
-        elif key == current.key:
-            return current
-        elif key < current.key:
-            return self.get_tree_node_by_key_aux(current.left, key)
-        else:  # key > current.key
-            return self.get_tree_node_by_key_aux(current.right, key)
+        while current is not None:
+            if key == current.key:
+                return current
+            elif key < current.key:
+                current = current.left
+            else:  # key > current.key
+                current = current.right
+        raise KeyError('Key not found: {0}'.format(key))
 
     def __setitem__(self, key: K, item: I) -> None:
         """
@@ -115,23 +279,37 @@ class BinarySearchTree(Generic[K, I]):
     def insert_aux(self, current: TreeNode, key: K, item: I) -> TreeNode:
         """
             Attempts to insert an item into the tree, it uses the Key to insert it
+            The descent is a loop which remembers the visited nodes, so that
+            retrace can fix the subtree sizes on the way back up.
             :complexity best: O(CompK) inserts the item at the root.
             :complexity worst: O(CompK * D) inserting at the bottom of the tree
             where D is the depth of the tree
             CompK is the complexity of comparing the keys
         """
-        if current is None:  # base case: at the leaf
-            current = TreeNode(key, item=item)
-            self.length += 1
-        elif key < current.key:
-            current.subtree_size+=1
-            current.left = self.insert_aux(current.left, key, item)
-        elif key > current.key:
-            current.subtree_size+=1
-            current.right = self.insert_aux(current.right, key, item)
-        else:  # key == current.key
-            raise ValueError('Inserting duplicate item')
-        return current
+        path = []
+        while current is not None:
+            path.append(current)
+            if key < current.key:
+                current = current.left
+            elif key > current.key:
+                current = current.right
+            elif self.multiset:  # key == current.key
+                current.count += 1
+                self.length += 1
+                return self.retrace(path)
+            else:  # key == current.key
+                raise ValueError('Inserting duplicate item')
+
+        new_node = self.node_type(key, item=item)
+        self.length += 1
+        if not path:  # the subtree was empty
+            return new_node
+        parent = path[-1]
+        if key < parent.key:
+            parent.left = new_node
+        else:
+            parent.right = new_node
+        return self.retrace(path)
 
     def __delitem__(self, key: K) -> None:
         self.root = self.delete_aux(self.root, key)
@@ -156,31 +334,64 @@ class BinarySearchTree(Generic[K, I]):
                          complexity is O(n).
 
         """
-
-        if current is None:  # key not found
+        path = []
+        target = current
+        while target is not None and key != target.key:
+            path.append(target)
+            target = target.left if key < target.key else target.right
+        if target is None:  # key not found
             raise ValueError('Deleting non-existent item')
-        elif key < current.key:
-            current.left  = self.delete_aux(current.left, key)
-        elif key > current.key:
-            current.right = self.delete_aux(current.right, key)
-        else:  # we found our key => do actual deletion
-            if self.is_leaf(current):
-                self.length -= 1
-                return None
-            elif current.left is None:
-                self.length -= 1
-                return current.right
-            elif current.right is None:
-                self.length -= 1
-                return current.left
-
-            # general case => find a successor
-            succ = self.get_successor(current)
-            current.key  = succ.key
-            current.item = succ.item
-            current.right = self.delete_aux(current.right, succ.key)
-        current.subtree_size -= 1
-        return current
+        if target.count > 1:  # only drop one occurrence
+            target.count -= 1
+            self.length -= 1
+            path.append(target)
+            return self.retrace(path)
+
+        if target.left is not None and target.right is not None:
+            # general case => copy the successor over and unlink the successor instead
+            path.append(target)
+            succ = target.right
+            while succ.left is not None:
+                path.append(succ)
+                succ = succ.left
+            target.key = succ.key
+            target.item = succ.item
+            target.count = succ.count
+            target = succ
+
+        replacement = target.left if target.left is not None else target.right
+        self.length -= 1
+        if not path:  # deleted the root of the subtree
+            return replacement
+        parent = path[-1]
+        if parent.left is target:
+            parent.left = replacement
+        else:
+            parent.right = replacement
+        return self.retrace(path)
+
+    def size(self, current: TreeNode | None) -> int:
+        """ Number of keys in a (possibly empty) subtree, counting multiplicity. """
+
+        return current.subtree_size if current is not None else 0
+
+    def update(self, current: TreeNode) -> None:
+        """
+            Recomputes the subtree_size of current from its children.
+            :complexity: O(1)
+        """
+        current.subtree_size = current.count + self.size(current.left) + self.size(current.right)
+
+    def retrace(self, path: list[TreeNode]) -> TreeNode:
+        """
+            Walks back up a root-to-parent path after an insertion or deletion
+            below it, fixing every node on the way, and returns the (possibly
+            new) root of the subtree the path starts at.
+            :complexity: O(len(path))
+        """
+        for node in reversed(path):
+            self.update(node)
+        return path[0]
 
     def get_successor(self, current: TreeNode) -> TreeNode:
         """
@@ -220,8 +431,8 @@ class BinarySearchTree(Generic[K, I]):
                          (the number of nodes in the subtree). Thus, the worst-case time complexity is O(n).
         """
 
-        if current.left is not None:
-            return self.get_minimal(current.left)
+        while current.left is not None:
+            current = current.left
         return current
         
     def is_leaf(self, current: TreeNode) -> bool:
@@ -229,6 +440,196 @@ class BinarySearchTree(Generic[K, I]):
 
         return current.left is None and current.right is None
 
+    def __iter__(self) -> Iterator[K]:
+        """
+            Lazily iterates over the keys in increasing order (once each, even
+            in a multiset).
+            :complexity: O(1) amortised per key, O(D) extra space
+            where D is the depth of the tree
+        """
+        for node in self.iter_nodes(self.left_spine(self.root)):
+            yield node.key
+
+    def items(self) -> Iterator[tuple[K, I]]:
+        """
+            Lazily iterates over the (key, item) pairs in increasing key order.
+            :complexity: see __iter__
+        """
+        for node in self.iter_nodes(self.left_spine(self.root)):
+            yield node.key, node.item
+
+    def range(self, lo: K, hi: K) -> Iterator[tuple[K, I]]:
+        """
+            Lazily iterates over the (key, item) pairs with lo <= key < hi in
+            increasing key order. Subtrees entirely below lo are never visited.
+            :complexity: O(CompK * (D + m)) where m is the number of pairs returned
+            D is the depth of the tree and CompK is the complexity of comparing the keys
+        """
+        stack = []
+        current = self.root
+        while current is not None:  # stack the ancestors which are >= lo
+            if current.key < lo:
+                current = current.right
+            else:
+                stack.append(current)
+                current = current.left
+        for node in self.iter_nodes(stack):
+            if not node.key < hi:
+                return
+            yield node.key, node.item
+
+    def left_spine(self, current: TreeNode | None, stack: list[TreeNode] | None = None) -> list[TreeNode]:
+        """
+            Pushes current and its chain of left descendants onto the stack.
+            :complexity: O(D) where D is the depth of the subtree
+        """
+        if stack is None:
+            stack = []
+        while current is not None:
+            stack.append(current)
+            current = current.left
+        return stack
+
+    def iter_nodes(self, stack: list[TreeNode]) -> Iterator[TreeNode]:
+        """
+            Lazily continues an in-order walk from a stack of pending nodes,
+            where the top of the stack is the next node to visit.
+            :complexity: O(1) amortised per node
+        """
+        while stack:
+            current = stack.pop()
+            yield current
+            self.left_spine(current.right, stack)
+
+    def select_path(self, k: int) -> tuple[list[TreeNode], int]:
+        """
+            Returns the in-order stack whose top is the node holding the kth
+            smallest key (k counts from 1), together with the number of
+            occurrences of that key which rank before k.
+            :complexity: O(D) where D is the depth of the tree
+        """
+        stack = []
+        current = self.root
+        while current is not None:
+            left_size = self.size(current.left)
+            if k <= left_size:
+                stack.append(current)
+                current = current.left
+            elif k <= left_size + current.count:
+                stack.append(current)
+                return stack, k - left_size - 1
+            else:
+                k = k - left_size - current.count
+                current = current.right
+        return stack, 0
+
+    def iter_from_rank(self, k: int) -> Iterator[TreeNode]:
+        """
+            Lazily iterates over the nodes in increasing key order, starting
+            from the one holding the kth smallest key (k counts from 1). Only the
+            path down to that node is visited before the first node is produced.
+            :complexity: O(D) to start, then O(1) amortised per node
+            where D is the depth of the tree
+        """
+        stack, _ = self.select_path(k)
+        return self.iter_nodes(stack)
+
+    def iter_keys_from_rank(self, k: int) -> Iterator[K]:
+        """
+            Lazily iterates over the keys in increasing order, starting from the
+            kth smallest one and repeating each key as many times as it occurs.
+            :complexity: O(D) to start, then O(1) amortised per key
+            where D is the depth of the tree
+        """
+        stack, skip = self.select_path(k)
+        for current in self.iter_nodes(stack):
+            for _ in range(current.count - skip):
+                yield current.key
+            skip = 0
+
+    def floor(self, key: K) -> TreeNode | None:
+        """
+            Returns the node with the largest key <= key, or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = None
+        current = self.root
+        while current is not None:
+            if key < current.key:
+                current = current.left
+            elif key == current.key:
+                return current
+            else:
+                best = current
+                current = current.right
+        return best
+
+    def ceiling(self, key: K) -> TreeNode | None:
+        """
+            Returns the node with the smallest key >= key, or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = None
+        current = self.root
+        while current is not None:
+            if current.key < key:
+                current = current.right
+            elif key == current.key:
+                return current
+            else:
+                best = current
+                current = current.left
+        return best
+
+    def predecessor(self, key: K) -> TreeNode | None:
+        """
+            Returns the node with the largest key strictly smaller than key
+            (which need not be in the tree), or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = None
+        current = self.root
+        while current is not None:
+            if current.key < key:
+                best = current
+                current = current.right
+            else:
+                current = current.left
+        return best
+
+    def successor(self, key: K) -> TreeNode | None:
+        """
+            Returns the node with the smallest key strictly larger than key
+            (which need not be in the tree), or None if there is none.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        best = None
+        current = self.root
+        while current is not None:
+            if key < current.key:
+                best = current
+                current = current.left
+            else:
+                current = current.right
+        return best
+
+    def rank(self, key: K) -> int:
+        """
+            Returns the number of keys in the tree strictly smaller than key
+            (counting multiplicity),
+            adding up the sizes of the left subtrees passed on the way down.
+            :complexity: O(CompK * D) where D is the depth of the tree
+        """
+        rank = 0
+        current = self.root
+        while current is not None:
+            if current.key < key:
+                rank += self.size(current.left) + current.count
+                current = current.right
+            else:
+                current = current.left
+        return rank
+
     def draw(self, to=sys.stdout):
         """ Draw the tree in the terminal. """
 
@@ -257,27 +658,24 @@ class BinarySearchTree(Generic[K, I]):
 
         Best case : The best case scenario occurs when k equals the size of the left 
                     subtree plus one. This means the kth_smallest is at the root of the subtree,
-                    which is found immediately without any further recursive calls. Hence, the best case complexity is O(1).
+                    which is found immediately without descending any further. Hence, the best case complexity is O(1).
         
         Worst case : The worst case scenario is when the k-th smallest element is a leaf node, which requires traversing from 
                      the root of the subtree to the leaf. This is analogous to searching for a key in the BST. If the tree is 
                      skewed, this path can be as long as n (the number of nodes in the tree), so the worst-case time complexity 
                      is O(n).
         """
-        if current is not None:
+        while current is not None:
             # Compute the size of the left subtree
             left_size = current.left.subtree_size if current.left else 0
 
             if k <= left_size: 
-                return self.kth_smallest(k, current.left)
-            elif k == left_size + 1: 
+                current = current.left
+            elif k <= left_size + current.count: 
                 return current
             else: 
-                return self.kth_smallest(k - left_size - 1, current.right)
-                #k- left_size-1 as its defs not in left half therefore you have to minus that and its not current node 
-                #therefore -1
-
-        
-
-
-
+                k = k - left_size - current.count
+                current = current.right
+                #k- left_size-count as its defs not in left half therefore you have to minus that and its not current node 
+                #therefore -count (the occurrences of the current key, 1 unless the tree is a multiset)
+        return None
@@ -3,43 +3,124 @@ from __future__ import annotations
 __author__ = "Brendon Taylor, modified by Jackson Goerner"
 __docformat__ = 'reStructuredText'
 
-from typing import Generic
+from typing import Generic, Callable, Any, Iterable
 from referential_array import ArrayR, T
 
 
 class MaxHeap(Generic[T]):
     MIN_CAPACITY = 1
 
-    def __init__(self, max_size: int) -> None:
+    def __init__(self, max_size: int, key: Callable[[T], Any] | None = None) -> None:
+        """
+        If key is given, elements are ordered by key(element), which is computed once
+        when an element is added and kept in keys, parallel to the_array. Otherwise
+        keys is the_array itself and elements are compared directly.
+        max_size is only the initial capacity: the heap grows when it is full.
+        """
         self.length = 0
+        self.key = key
         self.the_array = ArrayR(max(self.MIN_CAPACITY, max_size) + 1)
+        self.keys = self.the_array if key is None else ArrayR(len(self.the_array))
+
+    @classmethod
+    def from_iterable(cls, elements: Iterable[T], max_size: int = 0,
+                      key: Callable[[T], Any] | None = None) -> MaxHeap[T]:
+        """
+        Builds a heap holding the elements, with room for max(max_size, number of elements).
+        :complexity: O(n), see heapify
+        """
+        elements = list(elements)
+        heap = cls(max(max_size, len(elements)), key)
+        heap.heapify(elements)
+        return heap
+
+    def heapify(self, elements: Iterable[T]) -> None:
+        """
+        Replaces the contents of the heap with the elements: they are written into the
+        array as they come, then every element with a child is sunk, from the last one
+        (at length // 2) back to the root. The heap grows if needed to hold them.
+        :complexity: O(n) - sinking the element at height h costs O(h), and only
+        n / 2^(h+1) elements have height h, so the sinks cost O(n) in total
+        """
+        elements = list(elements)
+        self.reserve(len(elements))
+        for k in range(len(elements) + 1, self.length + 1):
+            self.the_array[k] = None
+            self.keys[k] = None
+        self.length = len(elements)
+        for k, element in enumerate(elements, 1):
+            self.the_array[k] = element
+            self.keys[k] = self.key(element) if self.key is not None else element
+        for k in range(self.length // 2, 0, -1):
+            self.sink(k)
 
     def __len__(self) -> int:
         return self.length
 
+    def capacity(self) -> int:
+        """ Returns the number of elements the heap can hold before it grows. """
+        return len(self.the_array) - 1
+
     def is_full(self) -> bool:
         return self.length + 1 == len(self.the_array)
 
+    def resize(self, capacity: int) -> None:
+        """
+        Moves the elements into new arrays with room for capacity elements.
+        :pre: capacity >= self.length
+        :complexity: O(capacity)
+        """
+        new_array = ArrayR(max(self.MIN_CAPACITY, capacity) + 1)
+        new_keys = new_array if self.key is None else ArrayR(len(new_array))
+        for k in range(1, self.length + 1):
+            new_array[k] = self.the_array[k]
+        if self.key is not None:
+            for k in range(1, self.length + 1):
+                new_keys[k] = self.keys[k]
+        self.the_array, self.keys = new_array, new_keys
+
+    def reserve(self, n: int) -> None:
+        """
+        Makes room for at least n elements, so that adding up to n elements in total
+        does not need to grow the heap again.
+        :complexity: O(n) if the heap grows, O(1) otherwise
+        """
+        if n > self.capacity():
+            self.resize(n)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Releases the room not used by the current elements.
+        :complexity: O(n)
+        """
+        if self.length < self.capacity():
+            self.resize(self.length)
+
     def rise(self, k: int) -> None:
         """
         Rise element at index k to its correct position
         :pre: 1 <= k <= self.length
         """
-        item = self.the_array[k]
-        while k > 1 and item > self.the_array[k // 2]:
+        item, item_key = self.the_array[k], self.keys[k]
+        while k > 1 and item_key > self.keys[k // 2]:
             self.the_array[k] = self.the_array[k // 2]
+            self.keys[k] = self.keys[k // 2]
             k = k // 2
         self.the_array[k] = item
+        self.keys[k] = item_key
 
     def add(self, element: T) -> bool:
         """
-        Swaps elements while rising
+        Swaps elements while rising. A full heap first doubles its capacity.
+        :complexity: O(log n) amortised - a doubling copies every element, but
+        happens once per capacity elements added
         """
         if self.is_full():
-            raise IndexError
+            self.resize(2 * self.capacity())
 
         self.length += 1
         self.the_array[self.length] = element
+        self.keys[self.length] = self.key(element) if self.key is not None else element
         self.rise(self.length)
 
     def largest_child(self, k: int) -> int:
@@ -49,7 +130,7 @@ class MaxHeap(Generic[T]):
         """
         
         if 2 * k == self.length or \
-                self.the_array[2 * k] > self.the_array[2 * k + 1]:
+                self.keys[2 * k] > self.keys[2 * k + 1]:
             return 2 * k
         else:
             return 2 * k + 1
@@ -59,17 +140,27 @@ class MaxHeap(Generic[T]):
             :pre: 1 <= k <= self.length
             :complexity: ???
         """
-        item = self.the_array[k]
+        item, item_key = self.the_array[k], self.keys[k]
 
         while 2 * k <= self.length:
             max_child = self.largest_child(k)
-            if self.the_array[max_child] <= item:
+            if self.keys[max_child] <= item_key:
                 break
             self.the_array[k] = self.the_array[max_child]
+            self.keys[k] = self.keys[max_child]
             k = max_child
 
         self.the_array[k] = item
+        self.keys[k] = item_key
         
+    def peek_max(self) -> T:
+        """ Return the maximum element without removing it.
+            :complexity: O(1)
+        """
+        if self.length == 0:
+            raise IndexError
+        return self.the_array[1]
+
     def get_max(self) -> T:
         """ Remove (and return) the maximum element from the heap. """
         if self.length == 0:
@@ -79,9 +170,127 @@ class MaxHeap(Generic[T]):
         self.length -= 1
         if self.length > 0:
             self.the_array[1] = self.the_array[self.length+1]
+            self.keys[1] = self.keys[self.length+1]
             self.sink(1)
         return max_elt
 
+
+class IndexedMaxHeap(MaxHeap[T]):
+    """ Max heap which tracks the index of every element, keyed by identity,
+        so an element can be updated or removed in place.
+        An element can only be in the heap once.
+    """
+
+    def __init__(self, max_size: int, key: Callable[[T], Any] | None = None) -> None:
+        MaxHeap.__init__(self, max_size, key)
+        self.position = {}
+
+    def __contains__(self, element: T) -> bool:
+        return id(element) in self.position
+
+    def heapify(self, elements: Iterable[T]) -> None:
+        """
+        Replaces the contents of the heap with the elements, see MaxHeap.heapify.
+        :raises ValueError: if an element is given twice
+        :complexity: O(n)
+        """
+        elements = list(elements)
+        position = {id(element): k for k, element in enumerate(elements, 1)}
+        if len(position) < len(elements):
+            raise ValueError('Element already in heap')
+        self.position = position  # kept up to date by the sinks
+        MaxHeap.heapify(self, elements)
+
+    def rise(self, k: int) -> None:
+        """
+        Rise element at index k to its correct position, recording the new
+        index of every element moved.
+        :pre: 1 <= k <= self.length
+        :complexity: O(log n) comparisons
+        """
+        item, item_key = self.the_array[k], self.keys[k]
+        while k > 1 and item_key > self.keys[k // 2]:
+            moved = self.the_array[k // 2]
+            self.the_array[k] = moved
+            self.keys[k] = self.keys[k // 2]
+            self.position[id(moved)] = k
+            k = k // 2
+        self.the_array[k] = item
+        self.keys[k] = item_key
+        self.position[id(item)] = k
+
+    def sink(self, k: int) -> None:
+        """ Make the element at index k sink to the correct position, recording
+            the new index of every element moved.
+            :pre: 1 <= k <= self.length
+            :complexity: O(log n) comparisons
+        """
+        item, item_key = self.the_array[k], self.keys[k]
+
+        while 2 * k <= self.length:
+            max_child = self.largest_child(k)
+            if self.keys[max_child] <= item_key:
+                break
+            moved = self.the_array[max_child]
+            self.the_array[k] = moved
+            self.keys[k] = self.keys[max_child]
+            self.position[id(moved)] = k
+            k = max_child
+
+        self.the_array[k] = item
+        self.keys[k] = item_key
+        self.position[id(item)] = k
+
+    def add(self, element: T) -> None:
+        """
+        :raises ValueError: if the element is already in the heap
+        :complexity: O(log n)
+        """
+        if element in self:
+            raise ValueError('Element already in heap')
+        MaxHeap.add(self, element)
+
+    def get_max(self) -> T:
+        """ Remove (and return) the maximum element from the heap.
+            :complexity: O(log n)
+        """
+        max_elt = MaxHeap.get_max(self)
+        del self.position[id(max_elt)]
+        return max_elt
+
+    def update(self, element: T) -> None:
+        """ Restores the heap order after the priority of element changed,
+            whether it increased or decreased, recomputing its key if the heap has
+            a key function.
+            :raises KeyError: if the element is not in the heap
+            :complexity: O(log n)
+        """
+        k = self.position[id(element)]
+        if self.key is not None:
+            self.keys[k] = self.key(element)
+        self.rise(k)
+        if self.position[id(element)] == k:
+            self.sink(k)
+
+    def remove(self, element: T) -> None:
+        """ Removes element from the heap, filling its place with the last element.
+            :raises KeyError: if the element is not in the heap
+            :complexity: O(log n)
+        """
+        k = self.position.pop(id(element))
+        last, last_key = self.the_array[self.length], self.keys[self.length]
+        self.the_array[self.length] = None
+        self.keys[self.length] = None
+        self.length -= 1
+        if k <= self.length:
+            self.the_array[k] = last
+            self.keys[k] = last_key
+            self.position[id(last)] = k
+            self.rise(k)
+            if self.position[id(last)] == k:
+                self.sink(k)
+
+
 if __name__ == '__main__':
     items = [ int(x) for x in input('Enter a list of numbers: ').strip().split() ]
     heap = MaxHeap(len(items))
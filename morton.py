@@ -0,0 +1,261 @@
+""" Linear octree over Morton (Z-order) codes.
+
+    A static, pointer-free alternative to ThreeDeeBeeTree for read-heavy use.
+    Every point is shifted by the smallest coordinate of the data on each axis
+    and turned into its Morton code, which interleaves the bits of its three
+    coordinates (x highest, then y, then z, matching the octant numbering of
+    BeeNode). The codes are kept sorted in one typed array, next to a list of
+    items, so point lookups are a bisect and points are never linked by
+    references.
+
+    Every octree cell, at any level, covers one contiguous run of codes, so a
+    box query splits the box into the cells it contains (code ranges) and
+    bisects for each one, only descending into cells which cross the boundary
+    of the box.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from array import array
+from bisect import bisect_left
+from typing import Generic, TypeVar, Iterable, Iterator
+
+from threedeebeetree import ThreeDeeBeeTree, Point
+
+I = TypeVar('I')
+
+# SPREAD[b] places bit i of the byte b at bit 3 * i
+SPREAD = [sum(((b >> i) & 1) << (3 * i) for i in range(8)) for b in range(256)]
+# COMPACT[c] gathers bits 0, 3, 6 and 9 of the 12-bit chunk c into a nibble, for each of the three axes
+COMPACT = [tuple(sum(((c >> (3 * i + 2 - axis)) & 1) << i for i in range(4)) for axis in range(3))
+           for c in range(1 << 12)]
+
+# Cells holding at most this many points are filtered point by point instead of split further
+SCAN_LIMIT = 16
+
+
+def spread(value: int) -> int:
+    """
+    Spreads the bits of a non-negative integer three positions apart.
+
+    Complexity : O(b) where b is the number of bits of value.
+    """
+    result, shift = 0, 0
+    while value:
+        result |= SPREAD[value & 255] << shift
+        value >>= 8
+        shift += 24
+    return result
+
+
+def morton_encode(point: Point) -> int:
+    """
+    Returns the Morton code of a point with non-negative integer coordinates.
+
+    Complexity : O(b) where b is the number of bits of the largest coordinate.
+    """
+    return spread(point[0]) << 2 | spread(point[1]) << 1 | spread(point[2])
+
+
+def morton_decode(code: int) -> Point:
+    """
+    Returns the point whose Morton code is code (the inverse of morton_encode).
+
+    Complexity : O(b) where b is the number of bits of code.
+    """
+    x = y = z = 0
+    shift = 0
+    while code:
+        nibbles = COMPACT[code & 4095]
+        x |= nibbles[0] << shift
+        y |= nibbles[1] << shift
+        z |= nibbles[2] << shift
+        code >>= 12
+        shift += 4
+    return x, y, z
+
+
+class MortonIndex(Generic[I]):
+    """ Read-only 3D point index sorted by Morton code. """
+
+    def __init__(self, pairs: Iterable[tuple[Point, I]] = ()) -> None:
+        """
+        Builds the index from (point, item) pairs with integer coordinates. For a repeated point
+        the item of its last occurrence is kept, as with repeated insertion into a ThreeDeeBeeTree.
+
+        Complexity :
+
+        Best case = Worst case : O(n log n) to sort the codes, plus O(n b) to compute them, where
+                                 b is the number of bits needed for the spread of the coordinates.
+        """
+        last = dict(pairs)
+        self.origin = tuple(min((point[axis] for point in last), default=0) for axis in range(3))
+        self.bits = max(((point[axis] - self.origin[axis]).bit_length() for point in last for axis in range(3)),
+                        default=0)
+        coded = sorted(((self.encode(point), item) for point, item in last.items()), key=lambda pair: pair[0])
+        # codes fit in machine words up to 21 bits per axis, past that they are kept as Python ints
+        self.codes = array('Q', (code for code, _ in coded)) if 3 * self.bits <= 64 else [code for code, _ in coded]
+        self.items = [item for _, item in coded]
+
+    @classmethod
+    def from_tree(cls, tree: ThreeDeeBeeTree[I]) -> MortonIndex[I]:
+        """
+        Builds an index holding the same points and items as tree.
+
+        Complexity : see __init__
+        """
+        return cls((node.key, node.item) for node in tree.iter_subtree(tree.root))
+
+    def encode(self, point: Point) -> int:
+        """
+        Returns the Morton code of point relative to the origin of the index, or -1 if the point
+        lies outside the region covered by the index.
+
+        Complexity : O(b)
+        """
+        shifted = (point[0] - self.origin[0], point[1] - self.origin[1], point[2] - self.origin[2])
+        if any(coordinate < 0 or coordinate >> self.bits for coordinate in shifted):
+            return -1
+        return morton_encode(shifted)
+
+    def decode(self, code: int) -> Point:
+        """
+        Returns the point with the given Morton code relative to the origin of the index.
+
+        Complexity : O(b)
+        """
+        x, y, z = morton_decode(code)
+        return x + self.origin[0], y + self.origin[1], z + self.origin[2]
+
+    def is_empty(self) -> bool:
+        return len(self) == 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def find(self, key: Point) -> int:
+        """
+        Returns the position of key in the sorted codes, or -1 if it is not in the index.
+
+        Complexity : O(b + log n)
+        """
+        code = self.encode(key)
+        if code < 0:
+            return -1
+        position = bisect_left(self.codes, code)
+        return position if position < len(self.codes) and self.codes[position] == code else -1
+
+    def __contains__(self, key: Point) -> bool:
+        return self.find(key) >= 0
+
+    def __getitem__(self, key: Point) -> I:
+        """
+        Complexity : see find
+
+        Raises KeyError if key is not in the index.
+        """
+        position = self.find(key)
+        if position < 0:
+            raise KeyError(key)
+        return self.items[position]
+
+    def get(self, key: Point, default: I | None = None) -> I | None:
+        """
+        Returns the item of key, or default if key is not in the index.
+
+        Complexity : see find
+        """
+        position = self.find(key)
+        return self.items[position] if position >= 0 else default
+
+    def __iter__(self) -> Iterator[Point]:
+        """
+        Lazily iterates over the points in Morton order.
+
+        Complexity : O(b) per point.
+        """
+        for code in self.codes:
+            yield self.decode(code)
+
+    def items_in_order(self) -> Iterator[tuple[Point, I]]:
+        """
+        Lazily iterates over the (point, item) pairs in Morton order.
+
+        Complexity : O(b) per point.
+        """
+        for code, item in zip(self.codes, self.items):
+            yield self.decode(code), item
+
+    def matching_runs(self, lo: Point, hi: Point) -> Iterator[tuple[int, int]]:
+        """
+        Lazily iterates, in Morton order, over runs start, end of positions in the sorted codes
+        whose points all lie in the box lo <= point <= hi (on every axis), covering every such point.
+
+        The box is split into octree cells from the largest down: a cell inside the box is one run
+        found by bisecting for its code range, a cell missing the box or holding no points is
+        skipped, and a cell crossing the boundary of the box is split into its eight octants,
+        unless it holds at most SCAN_LIMIT points, which are then checked one by one.
+
+        Complexity :
+
+        Best case : O(b) when the box misses the points, or contains all of them.
+
+        Worst case : O(n b) when the boundary of the box crosses most cells, but in general
+                     proportional to the number of cells crossing the boundary of the box, times
+                     O(log n) for their bisects.
+        """
+        box_lo = [max(lo[axis] - self.origin[axis], 0) for axis in range(3)]
+        box_hi = [min(hi[axis] - self.origin[axis], (1 << self.bits) - 1) for axis in range(3)]
+        if not self.items or any(box_lo[axis] > box_hi[axis] for axis in range(3)):
+            return
+        codes = self.codes
+        # (first code of the cell, lower corner of the cell, bits per axis spanned by the cell,
+        #  first and last position + 1 of its codes)
+        stack = [(0, (0, 0, 0), self.bits, 0, len(codes))]
+        while stack:
+            prefix, corner, level, start, end = stack.pop()
+            side = (1 << level) - 1
+            if all(box_lo[axis] <= corner[axis] and corner[axis] + side <= box_hi[axis] for axis in range(3)):
+                yield start, end
+            elif end - start <= SCAN_LIMIT:
+                for position in range(start, end):
+                    point = morton_decode(codes[position])
+                    if all(box_lo[axis] <= point[axis] <= box_hi[axis] for axis in range(3)):
+                        yield position, position + 1
+            else:
+                level -= 1
+                span = 1 << (3 * level)
+                half = 1 << level
+                children = []
+                for octant in range(8):
+                    child_corner = (corner[0] + (half if octant & 4 else 0),
+                                    corner[1] + (half if octant & 2 else 0),
+                                    corner[2] + (half if octant & 1 else 0))
+                    child_end = bisect_left(codes, prefix + (octant + 1) * span, start, end)
+                    if child_end > start and all(child_corner[axis] <= box_hi[axis] and
+                                                 box_lo[axis] <= child_corner[axis] + half - 1 for axis in range(3)):
+                        children.append((prefix + octant * span, child_corner, level, start, child_end))
+                    start = child_end
+                stack.extend(reversed(children))
+
+    def range_query(self, lo: Point, hi: Point) -> Iterator[tuple[Point, I]]:
+        """
+        Lazily iterates, in Morton order, over the (point, item) pairs with lo <= point <= hi on
+        every axis.
+
+        Complexity : see matching_runs, plus O(b) per point returned.
+        """
+        for start, end in self.matching_runs(lo, hi):
+            for position in range(start, end):
+                yield self.decode(self.codes[position]), self.items[position]
+
+    def range_count(self, lo: Point, hi: Point) -> int:
+        """
+        Counts the points with lo <= point <= hi on every axis, without visiting the points of
+        cells inside the box.
+
+        Complexity : see matching_runs
+        """
+        return sum(end - start for start, end in self.matching_runs(lo, hi))
@@ -21,6 +21,8 @@ class TreeNode(Generic[K, I]):
     right: TreeNode|None = None
     # This value should be maintained by yourself in bst.py
     subtree_size: int = 1
+    # Number of occurrences of key, only above 1 in multiset trees
+    count: int = 1
 
     def set_subtree_size(self, subtree_size: int) -> None:
         self.subtree_size = subtree_size
@@ -33,3 +35,10 @@ class TreeNode(Generic[K, I]):
         key = str(self.key) if type(self.key) != str else "'{0}'".format(self.key)
         item = str(self.item) if type(self.item) != str else "'{0}'".format(self.item)
         return '({0}, {1}, [{2}])'.format(key, item, self.subtree_size)
+
+
+@dataclass
+class AVLTreeNode(TreeNode[K, I]):
+    """ Node class represent AVL tree nodes, which also track their height. """
+
+    height: int = 1
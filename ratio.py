@@ -1,17 +1,35 @@
 from __future__ import annotations
-from typing import Generic, TypeVar
+from typing import Generic, TypeVar, Iterable, Iterator, Callable
+from itertools import islice
 from math import ceil,floor
-from bst import BinarySearchTree
-from node import TreeNode
+from avl import AVLTree
+from sketch import QuantileSketch
 
 T = TypeVar("T")
 I = TypeVar("I")
 
 class Percentiles(Generic[T]):
 
-    def __init__(self) -> None:
-        self.store = BinarySearchTree()
+    def __init__(self, store_type: Callable[..., AVLTree] = AVLTree) -> None:
+        """
+        store_type builds the (multiset) store, e.g. AVLTree or array_bst.ArrayBinarySearchTree,
+        called as store_type(multiset=True).
+        """
+        self.store = store_type(multiset=True)
     
+    @classmethod
+    def from_iterable(cls, points: Iterable[T], presorted: bool = False,
+                      store_type: Callable[..., AVLTree] = AVLTree) -> Percentiles[T]:
+        """
+        Builds a Percentiles store from all the given points at once, see __init__ for store_type.
+
+        Complexity : O(n) if presorted, otherwise O(n log n) for sorting the points, as the
+                     balanced store is then built in a single pass (see BinarySearchTree.bulk_load).
+        """
+        percentiles = cls(store_type)
+        percentiles.store.bulk_load(((point, point) for point in points), presorted)
+        return percentiles
+
     def add_point(self, item: T):
 
         """
@@ -23,9 +41,9 @@ class Percentiles(Generic[T]):
                     hence the best case complexity is O(1).
         
         Worst case : The worst case scenario for the add_point function is when the new item needs to be inserted 
-                     at a leaf node. This requires traversing from the root of the BST to a leaf. In a skewed tree 
-                     (which resembles a linked list more than a tree), this traversal can be as long as n (the number 
-                     of nodes in the tree), hence the worst-case time complexity is O(n).
+                     at a leaf node. This requires traversing from the root of the BST to a leaf. The store is an AVL tree, 
+                     so its height stays O(log n) regardless of the insertion order and the rotations on the way back up are 
+                     O(1) each, hence the worst-case time complexity is O(log n).
 
         """
         self.store[item] = item 
@@ -38,58 +56,185 @@ class Percentiles(Generic[T]):
                     item to be removed is at the root of the tree. In this case, the operation is 
                     done immediately without any further traversal. Therefore, the best case complexity is O(1).
         
-        Worst case : The worst case scenario for the remove_point function is when the item to be removed is a leaf node. 
-                     This requires traversing from the root of the BST to a leaf. If the tree is skewed (i.e., more like a 
-                     linked list than a tree), this path can be as long as n (the number of nodes in the tree), hence the worst-case
-                     time complexity is O(n).
+        Worst case : The worst case scenario for the remove_point function is when the item to be removed is a leaf node 
+                     or has two children (so its successor has to be found and removed). This requires traversing from the root 
+                     of the AVL tree to a leaf, which is O(log n) as the tree stays balanced, hence the worst-case time 
+                     complexity is O(log n).
         
         """
         del self.store[item]
 
     
+    def band_ranks(self, x: float, y: float) -> tuple[int, int]:
+        """
+        Returns the (1-based, inclusive) ranks of the smallest and largest points which are
+        at least x% from the bottom and at least y% from the top. The band is empty when
+        the first rank is larger than the second.
+
+        Complexity : O(1)
+        """
+        n = len(self.store)
+        bottom = max(1, ceil((x/100) * n + 1))
+        top = min(n, floor(n - (n * (y/100))))
+        return bottom, top
+
+    def band(self, x: float, y: float) -> Iterator[T]:
+        """
+        Lazily iterates, in increasing order, over the points which are at least x% from the
+        bottom and at least y% from the top.
+
+        Complexity :
+
+        Best case = Worst case : O(log n + k) where k is the number of points produced. Only the
+                                 path down to the bottom rank is visited before the in-order walk
+                                 starts, and the walk stops as soon as the top rank is reached, so
+                                 no node outside the band (apart from those on that path) is visited.
+        """
+        bottom, top = self.band_ranks(x, y)
+        if bottom > top:
+            return iter(())
+        return islice(self.store.iter_keys_from_rank(bottom), top - bottom + 1)
+
+    def band_count(self, x: float, y: float) -> int:
+        """
+        Returns the number of points ratio(x, y) would return, without visiting them.
+
+        Complexity : O(1)
+        """
+        bottom, top = self.band_ranks(x, y)
+        return max(0, top - bottom + 1)
+
+    def band_summary(self, x: float, y: float) -> tuple[int, T | None, T | None]:
+        """
+        Returns the number of points in the band together with its smallest and largest
+        point (both None when the band is empty).
+
+        Complexity : O(log n) for the two kth_smallest lookups.
+        """
+        bottom, top = self.band_ranks(x, y)
+        if bottom > top:
+            return 0, None, None
+        lowest = self.store.kth_smallest(bottom, self.store.root).key
+        highest = self.store.kth_smallest(top, self.store.root).key
+        return top - bottom + 1, lowest, highest
+
+    def add_points(self, items: Iterable[T]) -> None:
+        """
+        Adds a batch of points at once.
+
+        Complexity : O(k log k) to sort the batch of k points, plus O(n + k) when the store is
+                     rebuilt or O(k log n) when the points are inserted one by one,
+                     whichever is cheaper (see BinarySearchTree.insert_many).
+        """
+        self.store.insert_many((item, item) for item in items)
+
+    def remove_points(self, items: Iterable[T]) -> None:
+        """
+        Removes a batch of points at once.
+
+        Complexity : see add_points and BinarySearchTree.delete_many.
+        """
+        self.store.delete_many(items)
+
     def ratio(self, x, y) -> list[T]:
+        """
+        Returns the points which are at least x% from the bottom and at least y% from the top,
+        in increasing order.
 
+        Complexity : see band, the list holds the k points it produces so this is O(log n + k).
         """
-        
-        Complexity : 
+        return list(self.band(x, y))
 
-        Best case : If the kth_smallest method finds the nodes at the root and the ratio_aux only visits the root, 
-                    the best case time complexity will be O(1) for each, resulting in an overall best case complexity of O(1).
-        
-        Worst case : If both kth_smallest calls traverse the entire tree and ratio_aux also visits every node in the tree, the 
-                     worst case time complexity will be O(n) for each, resulting in an overall worst case complexity of O(3n) which simplifies to O(n) as we generally ignore constants in Big O notation.
-        
+
+
+class SketchPercentiles(Percentiles[float]):
+    """
+    Approximate Percentiles for numeric streams, backed by a QuantileSketch instead of a tree.
+    Memory is bounded by the number of sketch buckets, and every point reported by ratio is
+    within relative_accuracy of the true point of that rank.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        self.store = QuantileSketch(relative_accuracy, max_buckets)
+
+    @classmethod
+    def from_iterable(cls, points: Iterable[float], presorted: bool = False, relative_accuracy: float = 0.01,
+                      max_buckets: int = 2048) -> SketchPercentiles:
+        """
+        Builds a sketch with the given configuration (see __init__) from all the given points.
+        presorted is accepted so this can stand in for Percentiles.from_iterable, but it is
+        ignored, as the order of the points does not matter to a sketch.
+
+        Complexity : O(n) amortised, see QuantileSketch.add
+        """
+        percentiles = cls(relative_accuracy, max_buckets)
+        for point in points:
+            percentiles.add_point(point)
+        return percentiles
+
+    def add_point(self, item: float):
+        """
+        Complexity : O(1) amortised, see QuantileSketch.add
         """
-        bottom = self.store.kth_smallest(ceil((x/100) * self.store.length+1),self.store.root)
-        top = self.store.kth_smallest(floor(self.store.length - (self.store.length * (y/100))),self.store.root)
-        values = []
-
-        def ratio_aux(current: TreeNode):
-            """
-            Complexity :
-
-            Best case : The best-case scenario for ratio_aux function is when the tree is perfectly balanced, the root node 
-                        falls between the range bottom.key and top.key, and there is no need to make recursive calls to the left 
-                        and right children of the root node. In this case, the time complexity of the function would be constant 
-                        i.e., O(1).
-            
-            Worst case : The worst-case scenario for the ratio_aux function is when the tree is heavily skewed either to the left or 
-                         right (essentially becoming a linked list), or when all nodes fall in the range defined by bottom.key and top.key, 
-                         requiring to visit every node in the tree. The function makes recursive calls to left and right children of the current node, so in the worst-case scenario, it would visit all nodes in the tree. If there are n nodes in the tree, the time complexity of the function would be linear i.e., O(n).
-            
-            """
-            if current is not None:
-                if bottom.key <= current.key <= top.key:
-                    values.append(current.key)
-
-                if current.left is not None and current.key >= bottom.key:
-                    ratio_aux(current.left) 
-
-                if current.right is not None and current.key <= top.key:
-                    ratio_aux(current.right)
-        ratio_aux(self.store.root)
-        return values
+        self.store.add(item)
 
+    def remove_point(self, item: float):
+        """
+        Complexity : O(1), see QuantileSketch.remove
+        """
+        self.store.remove(item)
+
+    def add_points(self, items: Iterable[float]) -> None:
+        """
+        Complexity : O(k) amortised for a batch of k points, see QuantileSketch.add
+        """
+        for item in items:
+            self.store.add(item)
+
+    def remove_points(self, items: Iterable[float]) -> None:
+        """
+        Complexity : O(k) for a batch of k points, see QuantileSketch.remove
+        """
+        for item in items:
+            self.store.remove(item)
+
+    def merge(self, other: SketchPercentiles) -> None:
+        """
+        Adds all the points seen by other (e.g. another worker) to this store.
+
+        Complexity : O(B log B) where B is the number of buckets, see QuantileSketch.merge
+        """
+        self.store.merge(other.store)
+
+    def band(self, x: float, y: float) -> Iterator[float]:
+        """
+        Lazily iterates, in increasing order, over the approximate points which are at least
+        x% from the bottom and at least y% from the top.
+
+        Complexity : O(B log B + k) where B is the number of buckets and k the number of points produced.
+        """
+        bottom, top = self.band_ranks(x, y)
+        seen = 0
+        for value, count in self.store:
+            first, seen = seen + 1, seen + count
+            if seen < bottom:
+                continue
+            if first > top:
+                return
+            for _ in range(min(seen, top) - max(first, bottom) + 1):
+                yield value
+
+    def band_summary(self, x: float, y: float) -> tuple[int, float | None, float | None]:
+        """
+        Returns the number of points in the band together with its (approximate) smallest and
+        largest point (both None when the band is empty).
+
+        Complexity : O(B log B) where B is the number of buckets.
+        """
+        bottom, top = self.band_ranks(x, y)
+        if bottom > top:
+            return 0, None, None
+        return top - bottom + 1, self.store.value_at_rank(bottom), self.store.value_at_rank(top)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+""" Quantile sketch ADT.
+    Defines a mergeable sketch (in the style of DDSketch) which answers
+    rank and quantile queries over a stream of numbers with a bounded
+    relative error, using memory bounded by the number of buckets rather
+    than the number of points.
+
+    A value v > 0 is counted in bucket i = ceil(log(v) / log(gamma)), where
+    gamma = (1 + a) / (1 - a) for a relative accuracy a, and is reported
+    back as 2 * gamma**i / (gamma + 1), which is within a factor of a of
+    every value the bucket covers. Negative values use a mirrored set of
+    buckets and zero has its own counter.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+from math import ceil, log
+from typing import Iterator
+
+
+class BucketStore:
+    """ Counts per bucket index, collapsing the lowest buckets once there are too many. """
+
+    def __init__(self, max_buckets: int) -> None:
+        """
+            Initialises an empty store
+            :complexity: O(1)
+        """
+        self.counts: dict[int, int] = {}
+        self.max_buckets = max_buckets
+        self.floor = None  # buckets below this index were collapsed into it
+
+    def __len__(self) -> int:
+        """ Returns the number of non-empty buckets. """
+
+        return len(self.counts)
+
+    def index(self, index: int) -> int:
+        """ Maps a bucket index onto the bucket which actually holds it. """
+
+        if self.floor is not None and index < self.floor:
+            return self.floor
+        return index
+
+    def add(self, index: int, count: int) -> None:
+        """
+            Adds count to a bucket.
+            :complexity best: O(1)
+            :complexity worst: O(B log B) when the store has to be collapsed
+            where B is max_buckets
+        """
+        index = self.index(index)
+        self.counts[index] = self.counts.get(index, 0) + count
+        if len(self.counts) > self.max_buckets:
+            self.collapse()
+
+    def remove(self, index: int, count: int) -> None:
+        """
+            Removes count from a bucket.
+            :complexity: O(1)
+            :raises ValueError: if the bucket holds fewer than count points
+        """
+        index = self.index(index)
+        current = self.counts.get(index, 0)
+        if current < count:
+            raise ValueError('Removing non-existent item')
+        if current == count:
+            del self.counts[index]
+        else:
+            self.counts[index] = current - count
+
+    def collapse(self) -> None:
+        """
+            Merges the lowest buckets into one so at most max_buckets remain.
+            :complexity: O(B log B) where B is the number of buckets
+        """
+        indices = sorted(self.counts)
+        excess = len(indices) - self.max_buckets
+        if excess <= 0:
+            return
+        self.floor = indices[excess]
+        for index in indices[:excess]:
+            self.counts[self.floor] += self.counts.pop(index)
+
+    def merge(self, other: BucketStore) -> None:
+        """
+            Adds all the counts of other to this store.
+            :complexity: O(B log B) where B is the number of buckets
+        """
+        if other.floor is not None and (self.floor is None or other.floor > self.floor):
+            self.floor = other.floor
+            for index in [i for i in self.counts if i < self.floor]:
+                self.counts[self.floor] = self.counts.get(self.floor, 0) + self.counts.pop(index)
+        for index, count in other.counts.items():
+            index = self.index(index)
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.collapse()
+
+
+class QuantileSketch:
+    """ Mergeable sketch of a multiset of numbers with relative-error quantiles. """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        """
+            Initialises an empty sketch. Every value reported back is within
+            relative_accuracy of a value of the right rank, as long as no more
+            than max_buckets buckets are needed on either side of zero.
+            :complexity: O(1)
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('Relative accuracy should be between 0 and 1.')
+        if max_buckets <= 0:
+            raise ValueError('There should be at least one bucket.')
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = log(self.gamma)
+        self.positive = BucketStore(max_buckets)
+        self.negative = BucketStore(max_buckets)
+        self.zero_count = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        """ Returns the number of points in the sketch. """
+
+        return self.count
+
+    def bucket_index(self, value: float) -> int:
+        """ Index of the bucket counting a non-zero value of the given magnitude. """
+
+        return ceil(log(abs(value)) / self.log_gamma)
+
+    def bucket_value(self, index: int) -> float:
+        """ Magnitude reported for the points counted in a bucket. """
+
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """
+            Adds count copies of value to the sketch.
+            :complexity: O(1) amortised, see BucketStore.add
+        """
+        if value > 0:
+            self.positive.add(self.bucket_index(value), count)
+        elif value < 0:
+            self.negative.add(self.bucket_index(value), count)
+        else:
+            self.zero_count += count
+        self.count += count
+
+    def remove(self, value: float, count: int = 1) -> None:
+        """
+            Removes count copies of value from the sketch. As values are only
+            known up to their bucket, this succeeds for any value sharing a
+            bucket with points that were added.
+            :complexity: O(1)
+            :raises ValueError: if the bucket of value holds fewer than count points
+        """
+        if value > 0:
+            self.positive.remove(self.bucket_index(value), count)
+        elif value < 0:
+            self.negative.remove(self.bucket_index(value), count)
+        elif self.zero_count < count:
+            raise ValueError('Removing non-existent item')
+        else:
+            self.zero_count -= count
+        self.count -= count
+
+    def merge(self, other: QuantileSketch) -> None:
+        """
+            Adds all the points of other (e.g. a sketch built by another worker)
+            to this sketch.
+            :complexity: O(B log B) where B is the number of buckets
+            :raises ValueError: if the sketches have a different relative accuracy
+        """
+        if other.gamma != self.gamma:
+            raise ValueError('Cannot merge sketches with a different relative accuracy.')
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def __iter__(self) -> Iterator[tuple[float, int]]:
+        """
+            Iterates over (value, count) pairs, one per non-empty bucket, in
+            increasing order of value.
+            :complexity: O(B log B) where B is the number of buckets
+        """
+        for index in sorted(self.negative.counts, reverse=True):
+            yield -self.bucket_value(index), self.negative.counts[index]
+        if self.zero_count > 0:
+            yield 0, self.zero_count
+        for index in sorted(self.positive.counts):
+            yield self.bucket_value(index), self.positive.counts[index]
+
+    def value_at_rank(self, k: int) -> float:
+        """
+            Returns the (approximate) kth smallest value, k counting from 1.
+            :complexity: O(B log B) where B is the number of buckets
+            :raises IndexError: if k is not between 1 and the number of points
+        """
+        if not 1 <= k <= self.count:
+            raise IndexError('Rank out of range')
+        seen = 0
+        for value, count in self:
+            seen += count
+            if seen >= k:
+                return value
+
+    def quantile(self, q: float) -> float:
+        """
+            Returns the (approximate) value at quantile q, where 0 <= q <= 1.
+            :complexity: see value_at_rank
+        """
+        if not 0 <= q <= 1:
+            raise ValueError('Quantile should be between 0 and 1.')
+        return self.value_at_rank(1 + round(q * (self.count - 1)))
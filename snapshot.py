@@ -0,0 +1,349 @@
+""" Binary snapshots of BinarySearchTree and ThreeDeeBeeTree.
+
+    A snapshot is a header, a payload region and then one fixed-size record per
+    node, with the nodes laid out in pre-order. In a BST snapshot the left child
+    of node i (if any) is node i + 1 and its right child is node
+    i + 1 + left_span, where left_span is the number of nodes in the left
+    subtree. In a 3D tree snapshot the children of node i follow it in octant
+    order, each one spanning its subtree_size records. Either way a tree can be
+    relinked in O(n) without comparing keys, and a memory-mapped snapshot can
+    answer lookups by visiting only the records on a root-to-node path.
+
+    Keys of a BST and items of both trees are stored pickled, so only load
+    snapshots from a trusted source.
+"""
+
+from __future__ import annotations
+
+__docformat__ = 'reStructuredText'
+
+import mmap
+import pickle
+import struct
+from typing import TypeVar, Generic
+
+from bst import BinarySearchTree
+from node import TreeNode
+from threedeebeetree import ThreeDeeBeeTree, BeeNode, Point
+
+K = TypeVar('K')
+I = TypeVar('I')
+
+# magic, flags, number of nodes, offset of the first record
+HEADER = struct.Struct('<4sBQQ')
+BST_MAGIC = b'BSTS'
+TDBT_MAGIC = b'TDBS'
+MULTISET = 1
+
+# flags, left_span, subtree_size, count, payload offset, key length, item length
+BST_RECORD = struct.Struct('<BQQQQII')
+HAS_LEFT = 1
+HAS_RIGHT = 2
+
+# child mask, x, y, z, subtree_size, payload offset, item length
+TDBT_RECORD = struct.Struct('<BqqqQQI')
+
+
+def preorder_bst(root: TreeNode | None) -> tuple[list[TreeNode], list[int]]:
+    """
+        Lists the nodes of a BST in pre-order together with the number of
+        nodes in each left subtree.
+        :complexity: O(n) where n is the number of nodes
+    """
+    nodes = []
+    stack = [root] if root is not None else []
+    while stack:
+        current = stack.pop()
+        nodes.append(current)
+        if current.right is not None:
+            stack.append(current.right)
+        if current.left is not None:
+            stack.append(current.left)
+
+    # children come after their parent, so spans can be filled in backwards
+    position = {id(node): i for i, node in enumerate(nodes)}
+    spans = [1] * len(nodes)
+    left_spans = [0] * len(nodes)
+    for i in range(len(nodes) - 1, -1, -1):
+        current = nodes[i]
+        if current.left is not None:
+            left_spans[i] = spans[i + 1]
+            spans[i] += spans[i + 1]
+        if current.right is not None:
+            spans[i] += spans[position[id(current.right)]]
+    return nodes, left_spans
+
+
+def dump_bst(tree: BinarySearchTree[K, I], path: str) -> None:
+    """
+        Writes a snapshot of the tree to path.
+        :complexity: O(n) plus the cost of pickling every key and item
+    """
+    nodes, left_spans = preorder_bst(tree.root)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(BST_MAGIC, MULTISET if tree.multiset else 0, len(nodes), 0))
+        payload = []
+        offset = 0
+        for current in nodes:
+            key = pickle.dumps(current.key, pickle.HIGHEST_PROTOCOL)
+            item = pickle.dumps(current.item, pickle.HIGHEST_PROTOCOL)
+            f.write(key)
+            f.write(item)
+            payload.append((offset, len(key), len(item)))
+            offset += len(key) + len(item)
+
+        records_offset = HEADER.size + offset
+        for current, left_span, (offset, key_length, item_length) in zip(nodes, left_spans, payload):
+            flags = (HAS_LEFT if current.left is not None else 0) | (HAS_RIGHT if current.right is not None else 0)
+            f.write(BST_RECORD.pack(flags, left_span, current.subtree_size, current.count,
+                                    offset, key_length, item_length))
+        f.seek(0)
+        f.write(HEADER.pack(BST_MAGIC, MULTISET if tree.multiset else 0, len(nodes), records_offset))
+
+
+def read_header(data: bytes | mmap.mmap, magic: bytes) -> tuple[int, int, int]:
+    """
+        Returns the flags, number of nodes and records offset of a snapshot.
+        :raises ValueError: if the data is not a snapshot of the expected kind
+    """
+    if len(data) < HEADER.size:
+        raise ValueError('Not a snapshot')
+    found, flags, count, records_offset = HEADER.unpack_from(data, 0)
+    if found != magic:
+        raise ValueError('Not a snapshot of the expected kind')
+    return flags, count, records_offset
+
+
+def load_bst(path: str, tree_type: type[BinarySearchTree] = BinarySearchTree) -> BinarySearchTree:
+    """
+        Rebuilds a tree of type tree_type (e.g. AVLTree) from a snapshot, linking
+        the nodes by position only.
+        :complexity: O(n) plus the cost of unpickling every key and item
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    flags, count, records_offset = read_header(data, BST_MAGIC)
+    tree = tree_type(multiset=bool(flags & MULTISET))
+
+    records = list(BST_RECORD.iter_unpack(data[records_offset:records_offset + count * BST_RECORD.size]))
+    nodes = []
+    for _, _, subtree_size, occurrences, offset, key_length, item_length in records:
+        start = HEADER.size + offset
+        key = pickle.loads(data[start:start + key_length])
+        item = pickle.loads(data[start + key_length:start + key_length + item_length])
+        nodes.append(tree.node_type(key, item=item, subtree_size=subtree_size, count=occurrences))
+
+    for i in range(count - 1, -1, -1):  # children before parents
+        record_flags, left_span = records[i][0], records[i][1]
+        if record_flags & HAS_LEFT:
+            nodes[i].left = nodes[i + 1]
+        if record_flags & HAS_RIGHT:
+            nodes[i].right = nodes[i + 1 + left_span]
+        tree.update(nodes[i])
+    tree.root = nodes[0] if nodes else None
+    tree.length = tree.size(tree.root)
+    return tree
+
+
+class MappedSnapshot:
+    """ Read-only memory map of a snapshot file. """
+
+    magic = b''
+
+    def __init__(self, path: str) -> None:
+        """
+            Maps the snapshot at path without reading its records.
+            :complexity: O(1)
+        """
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.flags, self.count, self.records_offset = read_header(self.data, self.magic)
+
+    def close(self) -> None:
+        """ Unmaps the snapshot. """
+
+        self.data.close()
+
+    def __enter__(self) -> MappedSnapshot:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        else:
+            return True
+
+
+class MappedBinarySearchTree(MappedSnapshot, Generic[K, I]):
+    """ Read-only BST served straight from a memory-mapped snapshot. """
+
+    magic = BST_MAGIC
+
+    def record(self, i: int) -> tuple[int, int, int, int, int, int, int]:
+        """ Unpacks the record of the ith node in pre-order. """
+
+        return BST_RECORD.unpack_from(self.data, self.records_offset + i * BST_RECORD.size)
+
+    def __len__(self) -> int:
+        """ Returns the number of keys in the tree (counting multiplicity in a multiset). """
+
+        return self.record(0)[2] if self.count else 0
+
+    def __getitem__(self, key: K) -> I:
+        """
+            Returns the item stored with key, unpickling only the keys on the search path.
+            :complexity: O(CompK * D) where D is the depth of the tree
+            :raises KeyError: if the key is not in the tree
+        """
+        i = 0
+        while i < self.count:
+            flags, left_span, _, _, offset, key_length, item_length = self.record(i)
+            start = HEADER.size + offset
+            current_key = pickle.loads(self.data[start:start + key_length])
+            if key == current_key:
+                return pickle.loads(self.data[start + key_length:start + key_length + item_length])
+            elif key < current_key and flags & HAS_LEFT:
+                i = i + 1
+            elif key > current_key and flags & HAS_RIGHT:
+                i = i + 1 + left_span
+            else:
+                break
+        raise KeyError('Key not found: {0}'.format(key))
+
+    def kth_smallest(self, k: int) -> tuple[K, I]:
+        """
+            Returns the (key, item) pair holding the kth smallest key (k counts from 1).
+            :complexity: O(D) where D is the depth of the tree
+            :raises IndexError: if k is not between 1 and the number of keys
+        """
+        if not 1 <= k <= len(self):
+            raise IndexError('Rank out of range')
+        i = 0
+        while True:
+            flags, left_span, _, occurrences, offset, key_length, item_length = self.record(i)
+            left_size = self.record(i + 1)[2] if flags & HAS_LEFT else 0
+            if k <= left_size:
+                i = i + 1
+            elif k <= left_size + occurrences:
+                start = HEADER.size + offset
+                return (pickle.loads(self.data[start:start + key_length]),
+                        pickle.loads(self.data[start + key_length:start + key_length + item_length]))
+            else:
+                k -= left_size + occurrences
+                i = i + 1 + left_span
+
+
+def preorder_tdbt(root: BeeNode | None) -> list[tuple[BeeNode, int]]:
+    """
+        Lists the nodes of a 3D tree in pre-order, children in octant order,
+        each with the bit mask of its present children.
+        :complexity: O(n) where n is the number of nodes
+    """
+    nodes = []
+    stack = [root] if root is not None else []
+    while stack:
+        current = stack.pop()
+        mask = 0
+        for octant in range(7, -1, -1):
+            child = current.children[octant]
+            if child is not None:
+                mask |= 1 << octant
+                stack.append(child)
+        nodes.append((current, mask))
+    return nodes
+
+
+def dump_tdbt(tree: ThreeDeeBeeTree[I], path: str) -> None:
+    """
+        Writes a snapshot of the tree to path. Points are stored as raw
+        integers, items are pickled.
+        :complexity: O(n) plus the cost of pickling every item
+    """
+    nodes = preorder_tdbt(tree.root)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(TDBT_MAGIC, 0, len(nodes), 0))
+        payload = []
+        offset = 0
+        for current, _ in nodes:
+            item = pickle.dumps(current.item, pickle.HIGHEST_PROTOCOL)
+            f.write(item)
+            payload.append((offset, len(item)))
+            offset += len(item)
+
+        records_offset = HEADER.size + offset
+        for (current, mask), (offset, item_length) in zip(nodes, payload):
+            x, y, z = current.key
+            f.write(TDBT_RECORD.pack(mask, x, y, z, current.subtree_size, offset, item_length))
+        f.seek(0)
+        f.write(HEADER.pack(TDBT_MAGIC, 0, len(nodes), records_offset))
+
+
+def load_tdbt(path: str) -> ThreeDeeBeeTree:
+    """
+        Rebuilds a 3D tree from a snapshot, linking the nodes by position only.
+        :complexity: O(n) plus the cost of unpickling every item
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    _, count, records_offset = read_header(data, TDBT_MAGIC)
+    tree = ThreeDeeBeeTree()
+
+    records = list(TDBT_RECORD.iter_unpack(data[records_offset:records_offset + count * TDBT_RECORD.size]))
+    nodes = []
+    for _, x, y, z, subtree_size, offset, item_length in records:
+        start = HEADER.size + offset
+        nodes.append(BeeNode((x, y, z), pickle.loads(data[start:start + item_length]), subtree_size))
+
+    for i, current in enumerate(nodes):
+        mask = records[i][0]
+        position = i + 1
+        for octant in range(8):
+            if mask & (1 << octant):
+                current.set_child(octant, nodes[position])
+                position += nodes[position].subtree_size
+    tree.root = nodes[0] if nodes else None
+    tree.length = count
+    return tree
+
+
+class MappedThreeDeeBeeTree(MappedSnapshot, Generic[I]):
+    """ Read-only 3D tree served straight from a memory-mapped snapshot. """
+
+    magic = TDBT_MAGIC
+
+    def record(self, i: int) -> tuple[int, int, int, int, int, int, int]:
+        """ Unpacks the record of the ith node in pre-order. """
+
+        return TDBT_RECORD.unpack_from(self.data, self.records_offset + i * TDBT_RECORD.size)
+
+    def __len__(self) -> int:
+        """ Returns the number of points in the tree. """
+
+        return self.count
+
+    def __getitem__(self, key: Point) -> I:
+        """
+            Returns the item stored at point key, following its octant from the root.
+            :complexity: O(D) where D is the depth of the tree
+            :raises KeyError: if the point is not in the tree
+        """
+        i = 0
+        while i < self.count:
+            mask, x, y, z, _, offset, item_length = self.record(i)
+            if key == (x, y, z):
+                start = HEADER.size + offset
+                return pickle.loads(self.data[start:start + item_length])
+            octant = (4 if key[0] >= x else 0) | (2 if key[1] >= y else 0) | (1 if key[2] >= z else 0)
+            if not mask & (1 << octant):
+                break
+            position = i + 1
+            for before in range(octant):
+                if mask & (1 << before):
+                    position += self.record(position)[4]
+            i = position
+        raise KeyError('Key not found in tree')
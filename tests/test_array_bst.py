@@ -0,0 +1,94 @@
+import random
+import unittest
+from itertools import islice
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from array_bst import ArrayBinarySearchTree, NIL
+from ratio import Percentiles
+
+class ArrayBSTTest(unittest.TestCase):
+
+    @timeout()
+    @number("8.1")
+    def test_operations(self):
+        tree = ArrayBinarySearchTree(key_typecode='q')
+        for i, k in enumerate([95, 73, 99, 50, 85, 80]):
+            tree[k] = i + 1
+
+        self.assertEqual(len(tree), 6)
+        self.assertEqual(tree.size(tree.root), 6)
+        self.assertEqual(tree[80], 6)
+        self.assertNotIn(81, tree)
+        self.assertEqual((tree.kth_smallest(3, tree.root).key, tree.kth_smallest(3, tree.root).item), (80, 6))
+        self.assertEqual(tree.rank(95), 4)
+        self.assertEqual(list(tree), [50, 73, 80, 85, 95, 99])
+        with self.assertRaises(ValueError):
+            tree[50] = 0
+
+        del tree[73]  # two children => replaced by its successor
+        self.assertEqual(list(tree.items()), [(50, 4), (80, 6), (85, 5), (95, 1), (99, 3)])
+        self.assertEqual(tree.size(tree.root), 5)
+        freed = tree.free
+        self.assertNotEqual(freed, NIL)
+        tree[60] = 7  # reuses the freed slot
+        self.assertEqual(tree.free, NIL)
+        self.assertEqual(tree.keys[freed], 60)
+        self.assertEqual(len(tree.node_items), 6)
+        with self.assertRaises(ValueError):
+            del tree[73]
+
+    @timeout()
+    @number("8.2")
+    def test_bulk_and_multiset(self):
+        random.seed(1239)
+        values = [random.randrange(50) for _ in range(2000)]
+        tree = ArrayBinarySearchTree.from_iterable(((v, v) for v in values), multiset=True, key_typecode='q')
+        expected = sorted(values)
+
+        self.assertEqual(len(tree), 2000)
+        self.assertLessEqual(len(tree.node_items), 50)
+        for k in (1, 500, 2000):
+            self.assertEqual(tree.kth_smallest(k, tree.root).key, expected[k - 1])
+
+        for v in values[:1000]:
+            del tree[v]
+        tree[7] = 7
+        expected = sorted(values[1000:] + [7])
+        self.assertEqual([tree.kth_smallest(k, tree.root).key for k in range(1, len(expected) + 1)], expected)
+        self.assertEqual(tree.rank(25), sum(1 for v in expected if v < 25))
+
+    @timeout()
+    @number("8.3")
+    def test_percentiles_store(self):
+        random.seed(48123)
+        points = [random.randrange(200) for _ in range(3000)]
+        p = Percentiles(store_type=ArrayBinarySearchTree)
+        reference = Percentiles()
+        p.add_points(points[:1500])
+        reference.add_points(points[:1500])
+        for point in points[1500:]:
+            p.add_point(point)
+            reference.add_point(point)
+        p.remove_points(points[:1000])
+        reference.remove_points(points[:1000])
+        for point in points[2000:2500]:
+            p.remove_point(point)
+            reference.remove_point(point)
+
+        self.assertEqual(p.ratio(10, 20), reference.ratio(10, 20))
+        self.assertEqual(p.band_summary(5, 5), reference.band_summary(5, 5))
+        p = Percentiles.from_iterable(points, store_type=ArrayBinarySearchTree)
+        self.assertEqual(p.ratio(0, 0), sorted(points))
+
+        tree = p.store
+        self.assertEqual(list(tree.range(50, 53)), [(k, k) for k in range(50, 53) if k in tree])
+        self.assertEqual(tree.floor(80.5).key, max(k for k in tree if k <= 80.5))
+        self.assertEqual(tree.ceiling(80.5).key, min(k for k in tree if k >= 80.5))
+        self.assertEqual(tree.predecessor(min(tree)), None)
+        self.assertEqual(tree.successor(50).key, min(k for k in tree if k > 50))
+        distinct = sorted(set(points))
+        start = distinct.index(sorted(points)[10])
+        self.assertEqual([node.key for node in islice(tree.iter_from_rank(11), 3)], distinct[start:start + 3])
+        with self.assertRaises(KeyError):
+            tree.get_tree_node_by_key(-1)
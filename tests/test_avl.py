@@ -0,0 +1,54 @@
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from avl import AVLTree
+
+def check_invariants(test: unittest.TestCase, node) -> int:
+    """ Checks AVL balance and subtree sizes, returning the height of node. """
+    if node is None:
+        return 0
+    left = check_invariants(test, node.left)
+    right = check_invariants(test, node.right)
+    test.assertLessEqual(abs(left - right), 1)
+    test.assertEqual(node.height, 1 + max(left, right))
+    expected_size = 1
+    expected_size += node.left.subtree_size if node.left else 0
+    expected_size += node.right.subtree_size if node.right else 0
+    test.assertEqual(node.subtree_size, expected_size)
+    return node.height
+
+class AVLTest(unittest.TestCase):
+
+    @timeout()
+    @number("6.1")
+    def test_sorted_insertion(self):
+        tree = AVLTree()
+        for i in range(5000):
+            tree[i] = str(i)
+
+        self.assertEqual(len(tree), 5000)
+        self.assertLessEqual(tree.root.height, 18)
+        check_invariants(self, tree.root)
+        for k in (1, 17, 2500, 5000):
+            kth = tree.kth_smallest(k, tree.root)
+            self.assertEqual(kth.key, k - 1)
+            self.assertEqual(kth.item, str(k - 1))
+
+    @timeout()
+    @number("6.2")
+    def test_deletion(self):
+        tree = AVLTree()
+        for i in range(1000):
+            tree[i] = i
+        for i in range(0, 1000, 3):
+            del tree[i]
+
+        self.assertEqual(len(tree), 666)
+        check_invariants(self, tree.root)
+        self.assertNotIn(999, tree)
+        self.assertIn(998, tree)
+        self.assertEqual(tree.kth_smallest(1, tree.root).key, 1)
+        self.assertEqual(tree.kth_smallest(666, tree.root).key, 998)
+        with self.assertRaises(ValueError):
+            del tree[3]
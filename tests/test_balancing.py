@@ -4,13 +4,18 @@ from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 
 from threedeebeetree import ThreeDeeBeeTree, BeeNode
-from balancing import make_ordering
+from balancing import make_ordering, make_tree
 
 def get_size(node):
     if node is None:
         return 0
     return node.subtree_size
 
+def get_depth(node: BeeNode):
+    if node is None:
+        return 0
+    return 1 + max(get_depth(child) for child in node.children)
+
 # Testing function to calculate the worst ratio on your 3️⃣🇩🐝🌳
 def collect_worst_ratio(node: BeeNode):
     default = (1, 0, "")
@@ -121,4 +126,61 @@ class TestBalancing(unittest.TestCase):
             tdbt[p] = i
         
         ratio, smaller, axis = collect_worst_ratio(tdbt.root)
-        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
\ No newline at end of file
+        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
+
+    @timeout()
+    @number("4.3")
+    def test_make_tree(self):
+        random.seed(4231)
+        points = [tuple(random.randrange(-20, 20) for _ in range(3)) for _ in range(3000)]
+        tdbt = make_tree(points, list(range(len(points))))
+
+        unique = set(points)
+        self.assertEqual(len(tdbt), len(unique))
+        self.assertEqual(tdbt.root.subtree_size, len(unique))
+        for i, p in enumerate(points):
+            self.assertIn(p, tdbt)
+        last = {p: i for i, p in enumerate(points)}
+        self.assertTrue(all(tdbt[p] == i for p, i in last.items()))
+
+        ratio, smaller, axis = collect_worst_ratio(tdbt.root)
+        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
+        self.assertSetEqual(set(make_ordering(points)), unique)
+
+        # every point shares z (flat) or y and z (collinear): the other axes must still be split
+        flat = [(random.randrange(10000), random.randrange(10000), 0) for _ in range(5000)]
+        collinear = [(i, 0, 0) for i in range(5000)]
+        for points in (flat, collinear):
+            tdbt = make_tree(points)
+            self.assertEqual(len(tdbt), len(set(points)))
+            self.assertLessEqual(get_depth(tdbt.root), 16)
+
+    @timeout()
+    @number("4.4")
+    def test_rebalancing_stream(self):
+        random.seed(10239123)
+        tdbt = ThreeDeeBeeTree(rebalance=True)
+        points = []
+        for i in range(3000):  # a drifting stream, which skews plain insertion badly
+            point = (i + random.randrange(50), 2 * i + random.randrange(50), random.randrange(3000))
+            points.append(point)
+            tdbt[point] = i
+
+        self.assertEqual(len(tdbt), len(set(points)))
+        self.assertEqual(tdbt.root.subtree_size, len(set(points)))
+        ratio, smaller, axis = collect_worst_ratio(tdbt.root)
+        self.assertLessEqual(ratio, 7, f"Axis {axis} has ratio 1:{ratio}.")
+        last = {p: i for i, p in enumerate(points)}
+        self.assertTrue(all(tdbt[p] == i for p, i in last.items()))
+
+        # ties on an axis can't be split, but must neither be rebuilt on every insertion nor deepen the tree
+        collinear = [(i, 0, 0) for i in range(1000)]
+        flat = sorted((random.randrange(10000), random.randrange(10000), 0) for _ in range(2000))
+        for points, depth in ((collinear, 18), (flat, 16)):
+            tdbt = ThreeDeeBeeTree(rebalance=True)
+            for i, point in enumerate(points):
+                tdbt[point] = i
+            self.assertEqual(len(tdbt), len(set(points)))
+            self.assertLessEqual(get_depth(tdbt.root), depth)
+            last = {p: i for i, p in enumerate(points)}
+            self.assertTrue(all(tdbt[p] == i for p, i in last.items()))
@@ -1,3 +1,4 @@
+import random
 import unittest
 from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
@@ -47,3 +48,89 @@ class TestBeehiveSelector(unittest.TestCase):
         for actual, ex in zip(all_emeralds, expected):
             self.assertAlmostEqual(actual, ex, 0)
         
+
+    @timeout()
+    @number("5.2")
+    def test_update_and_remove(self):
+        s = BeehiveSelector(4)
+        b1, b2, b3, b4 = (
+            Beehive(15, 12, 13, capacity=40, nutrient_factor=5, volume=15),
+            Beehive(25, 22, 23, capacity=15, nutrient_factor=8, volume=40),
+            Beehive(35, 32, 33, capacity=40, nutrient_factor=3, volume=40),
+            Beehive(45, 42, 43, capacity=1, nutrient_factor=85, volume=10),
+        )
+        for hive in [b1, b2, b3, b4]:
+            s.add_beehive(hive)
+
+        s.update_beehive(b1, volume=100)  # 5 * 40
+        self.assertEqual((b1.volume, b1.capacity), (100, 40))
+        s.remove_beehive(b2)
+        s.update_beehive(b3, nutrient_factor=1)  # 1 * 40
+        with self.assertRaises(KeyError):
+            s.update_beehive(b2, volume=0)
+        with self.assertRaises(KeyError):
+            s.remove_beehive(b2)
+
+        self.assertEqual(s.harvest_best_beehive(), 200)  # b1
+        self.assertEqual(s.harvest_best_beehive(), 200)  # b1
+        self.assertEqual(s.harvest_best_beehive(), 100)  # b1, 5 * 20
+        self.assertEqual(s.harvest_best_beehive(), 85)  # b4
+        s.update_beehive(b4, capacity=10)  # 85 * 9
+        self.assertEqual(s.harvest_best_beehive(), 765)  # b4
+        self.assertEqual(s.harvest_best_beehive(), 40)  # b3
+
+    @timeout()
+    @number("5.3")
+    def test_set_all_beehives(self):
+        s = BeehiveSelector(3)
+        s.add_beehive(Beehive(0, 0, 0, capacity=1, nutrient_factor=1000, volume=1))
+        hives = [Beehive(i, i, i, capacity=10, nutrient_factor=i, volume=10 * i) for i in range(1, 6)]
+        s.set_all_beehives(hives)
+        self.assertEqual(len(s.beehives), 5)
+        self.assertEqual([s.harvest_best_beehive() for _ in range(4)], [50, 50, 50, 50])
+        s.update_beehive(hives[0], nutrient_factor=100)
+        self.assertEqual(s.harvest_best_beehive(), 1000)
+
+    @timeout()
+    @number("5.4")
+    def test_harvest_many(self):
+        random.seed(2404)
+        stats = [(random.randrange(1, 30), random.randrange(1, 20), random.randrange(200)) for _ in range(50)]
+        one_by_one, batched = BeehiveSelector(50), BeehiveSelector(50)
+        for i, (capacity, nutrient_factor, volume) in enumerate(stats):
+            one_by_one.add_beehive(Beehive(i, i, i, capacity, nutrient_factor, volume))
+            batched.add_beehive(Beehive(i, i, i, capacity, nutrient_factor, volume))
+
+        expected = [one_by_one.harvest_best_beehive() for _ in range(300)]
+        log = []
+        self.assertEqual(batched.harvest_many(300, log), sum(expected))
+        self.assertEqual([emeralds for _, rounds, emeralds in log for _ in range(rounds)], expected)
+        self.assertLess(len(log), 300)
+        self.assertEqual(sorted(hive.volume for hive in batched.beehives.the_array[1:51]),
+                         sorted(hive.volume for hive in one_by_one.beehives.the_array[1:51]))
+
+        # every hive runs dry well before a million rounds
+        total = batched.harvest_many(10 ** 6)
+        self.assertEqual(total, sum(one_by_one.harvest_best_beehive() for _ in range(20000)))
+        self.assertEqual(batched.harvest_many(5), 0)
+        self.assertEqual(BeehiveSelector(1).harvest_many(5), 0)
+
+        # a product of 0 still drains the volume, as single harvests do
+        for volumes in ([22], [22, 13]):
+            one_by_one, batched = BeehiveSelector(), BeehiveSelector()
+            for volume in volumes:
+                one_by_one.add_beehive(Beehive(0, 0, 0, capacity=5, nutrient_factor=0, volume=volume))
+                batched.add_beehive(Beehive(0, 0, 0, capacity=5, nutrient_factor=0, volume=volume))
+            self.assertEqual(sum(one_by_one.harvest_best_beehive() for _ in range(39)), 0)
+            self.assertEqual(batched.harvest_many(39), 0)
+            self.assertEqual([hive.volume for hive in batched.beehives.the_array[1:len(volumes) + 1]],
+                             [hive.volume for hive in one_by_one.beehives.the_array[1:len(volumes) + 1]])
+
+    @timeout()
+    @number("5.5")
+    def test_growth(self):
+        s = BeehiveSelector()
+        for i in range(1, 101):
+            s.add_beehive(Beehive(i, i, i, capacity=i, nutrient_factor=1, volume=i))
+        self.assertEqual(len(s.beehives), 100)
+        self.assertEqual([s.harvest_best_beehive() for _ in range(3)], [100, 99, 98])
@@ -77,3 +77,136 @@ class BSTTest(unittest.TestCase):
         kth = BST.kth_smallest(5, BST.root)
         self.assertEqual(kth.key, 95)
         self.assertEqual(kth.item, 1)
+
+    @timeout()
+    @number("1.4")
+    def test_degenerate(self):
+        BST = BinarySearchTree()
+        n = 2000  # deeper than the default recursion limit
+        for i in range(n):
+            BST[i] = -i
+
+        self.assertEqual(BST.root.subtree_size, n)
+        self.assertEqual(BST[n - 1], -(n - 1))
+        self.assertEqual(BST.get_minimal(BST.root).key, 0)
+        self.assertEqual(BST.kth_smallest(n, BST.root).key, n - 1)
+
+        for i in range(0, n, 2):
+            del BST[i]
+        self.assertEqual(len(BST), n // 2)
+        self.assertEqual(BST.root.subtree_size, n // 2)
+        self.assertNotIn(n - 2, BST)
+        self.assertEqual(BST.kth_smallest(n // 2, BST.root).key, n - 1)
+
+    @timeout()
+    @number("1.5")
+    def test_bulk_load(self):
+        keys = [50, 4, 99, 73, 80, 12, 95, 85, 1, 60]
+        BST = BinarySearchTree.from_iterable((k, str(k)) for k in keys)
+
+        self.assertEqual(len(BST), len(keys))
+        self.assertEqual(BST.root.subtree_size, len(keys))
+        self.assertEqual(BST.root.key, 73)
+        for i, k in enumerate(sorted(keys)):
+            self.assertEqual(BST.kth_smallest(i + 1, BST.root).key, k)
+            self.assertEqual(BST[k], str(k))
+
+        BST.bulk_load(((i, i) for i in range(7)), presorted=True)
+        self.assertEqual(len(BST), 7)
+        self.assertEqual(BST.root.key, 3)
+        self.assertEqual(BST.root.left.subtree_size, 3)
+        self.assertEqual(BST.root.right.key, 5)
+
+        with self.assertRaises(ValueError):
+            BinarySearchTree.from_iterable([(1, 1), (2, 2), (1, 3)])
+
+    @timeout()
+    @number("1.6")
+    def test_ordered_queries(self):
+        BST = BinarySearchTree()
+        keys = [95, 73, 99, 50, 85, 80]
+        for i, k in enumerate(keys):
+            BST[k] = i + 1
+
+        self.assertEqual(list(BST), [50, 73, 80, 85, 95, 99])
+        self.assertEqual(list(BST.items())[:2], [(50, 4), (73, 2)])
+        self.assertEqual(list(BST.range(73, 95)), [(73, 2), (80, 6), (85, 5)])
+        self.assertEqual(list(BST.range(74, 81)), [(80, 6)])
+        self.assertEqual(list(BST.range(100, 200)), [])
+
+        self.assertEqual(BST.floor(84).key, 80)
+        self.assertEqual(BST.floor(85).key, 85)
+        self.assertIsNone(BST.floor(49))
+        self.assertEqual(BST.ceiling(86).key, 95)
+        self.assertIsNone(BST.ceiling(100))
+        self.assertEqual(BST.predecessor(85).key, 80)
+        self.assertIsNone(BST.predecessor(50))
+        self.assertEqual(BST.successor(85).key, 95)
+        self.assertIsNone(BST.successor(99))
+
+        self.assertEqual(BST.rank(50), 0)
+        self.assertEqual(BST.rank(81), 3)
+        self.assertEqual(BST.rank(1000), 6)
+
+    @timeout()
+    @number("1.7")
+    def test_batches(self):
+        BST = BinarySearchTree.from_iterable((k, k) for k in range(0, 1000, 2))
+        BST.insert_many((k, k) for k in range(999, 0, -2))  # large batch => rebuild
+        self.assertEqual(list(BST), list(range(1000)))
+        self.assertEqual(BST.root.subtree_size, 1000)
+
+        BST.insert_many([(1500, 1), (1200, 2)])  # small batch => single insertions
+        self.assertEqual(len(BST), 1002)
+        self.assertEqual(BST[1200], 2)
+
+        with self.assertRaises(ValueError):
+            BST.insert_many([(2000, 0), (10, 0)])
+        with self.assertRaises(ValueError):
+            BST.insert_many((k, k) for k in range(1001, 2001))
+        self.assertNotIn(2000, BST)
+
+        BST.delete_many(range(0, 1000, 3))
+        self.assertEqual(len(BST), 668)
+        self.assertEqual(BST.root.subtree_size, 668)
+        self.assertNotIn(999, BST)
+        BST.delete_many([1500])
+        self.assertNotIn(1500, BST)
+        with self.assertRaises(ValueError):
+            BST.delete_many(range(1, 300))
+        self.assertEqual(len(BST), 667)
+
+    @timeout()
+    @number("1.8")
+    def test_multiset(self):
+        BST = BinarySearchTree(multiset=True)
+        for k in [5, 3, 5, 8, 5, 3]:
+            BST[k] = k
+
+        self.assertEqual(len(BST), 6)
+        self.assertEqual(BST.root.subtree_size, 6)
+        self.assertEqual(BST.root.count, 3)
+        self.assertEqual(list(BST), [3, 5, 8])
+        self.assertEqual([BST.kth_smallest(k, BST.root).key for k in range(1, 7)], [3, 3, 5, 5, 5, 8])
+        self.assertEqual(list(BST.iter_keys_from_rank(4)), [5, 5, 8])
+        self.assertEqual(BST.rank(8), 5)
+
+        del BST[5]
+        self.assertEqual(BST.root.count, 2)
+        self.assertEqual(BST.root.subtree_size, 5)
+        del BST[3]
+        del BST[3]
+        self.assertNotIn(3, BST)
+        self.assertEqual(len(BST), 3)
+
+        BST.insert_many((k, k) for k in [8, 8, 1, 5])
+        self.assertEqual([BST.kth_smallest(k, BST.root).key for k in range(1, 8)], [1, 5, 5, 5, 8, 8, 8])
+        BST.delete_many([8, 8, 5])
+        self.assertEqual([BST.kth_smallest(k, BST.root).key for k in range(1, 5)], [1, 5, 5, 8])
+        with self.assertRaises(ValueError):
+            BST.delete_many([1, 1])
+        self.assertEqual(len(BST), 4)
+
+        BST = BinarySearchTree.from_iterable([(2, 'a'), (1, 'b'), (2, 'c')], multiset=True)
+        self.assertEqual(BST.root.subtree_size, 3)
+        self.assertEqual(BST[2], 'a')
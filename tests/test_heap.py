@@ -0,0 +1,150 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from heap import MaxHeap, IndexedMaxHeap
+
+class Box:
+    """ Mutable priority, compared by value but tracked by identity. """
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value < other.value
+
+    def __gt__(self, other):
+        return self.value > other.value
+
+    def __le__(self, other):
+        return self.value <= other.value
+
+    def __ge__(self, other):
+        return self.value >= other.value
+
+class HeapTest(unittest.TestCase):
+
+    def check_positions(self, heap: IndexedMaxHeap) -> None:
+        self.assertEqual(len(heap.position), len(heap))
+        for k in range(1, len(heap) + 1):
+            self.assertEqual(heap.position[id(heap.the_array[k])], k)
+            if k > 1:
+                self.assertLessEqual(heap.the_array[k].value, heap.the_array[k // 2].value)
+
+    @timeout()
+    @number("11.1")
+    def test_indexed_updates(self):
+        random.seed(2101)
+        heap = IndexedMaxHeap(300)
+        boxes = [Box(random.randrange(1000)) for _ in range(300)]
+        for box in boxes:
+            heap.add(box)
+        with self.assertRaises(ValueError):
+            heap.add(boxes[0])
+
+        for _ in range(500):
+            box = random.choice(boxes)
+            box.value = random.randrange(1000)
+            heap.update(box)
+        self.check_positions(heap)
+
+        for box in boxes[:100]:
+            heap.remove(box)
+        self.assertNotIn(boxes[0], heap)
+        self.assertIn(boxes[100], heap)
+        with self.assertRaises(KeyError):
+            heap.remove(boxes[0])
+        self.check_positions(heap)
+
+        values = [heap.get_max().value for _ in range(len(heap))]
+        self.assertEqual(values, sorted((box.value for box in boxes[100:]), reverse=True))
+        self.assertEqual(heap.position, {})
+
+    @timeout()
+    @number("11.2")
+    def test_cached_keys(self):
+        random.seed(2202)
+        calls = []
+
+        def key(box: Box) -> int:
+            calls.append(box)
+            return box.value
+
+        heap = IndexedMaxHeap(100, key=key)
+        boxes = [Box(random.randrange(1000)) for _ in range(100)]
+        for box in boxes:
+            heap.add(box)
+        self.assertEqual(len(calls), 100)  # once per element, not per comparison
+        for k in range(1, 101):
+            self.assertEqual(heap.keys[k], heap.the_array[k].value)
+
+        boxes[7].value = 5000
+        heap.update(boxes[7])
+        self.assertEqual(len(calls), 101)
+        heap.remove(boxes[8])
+        self.check_positions(heap)
+        self.assertIs(heap.get_max(), boxes[7])
+
+        plain = MaxHeap(10)
+        self.assertIs(plain.keys, plain.the_array)
+        for value in [3, 9, 1, 7]:
+            plain.add(value)
+        self.assertEqual([plain.get_max() for _ in range(4)], [9, 7, 3, 1])
+
+    @timeout()
+    @number("11.3")
+    def test_heapify(self):
+        random.seed(2303)
+        values = [random.randrange(1000) for _ in range(500)]
+        heap = MaxHeap.from_iterable(values)
+        self.assertEqual(len(heap), 500)
+        self.assertTrue(heap.is_full())
+        self.assertEqual([heap.get_max() for _ in range(500)], sorted(values, reverse=True))
+
+        boxes = [Box(value) for value in values]
+        heap = IndexedMaxHeap.from_iterable(boxes, 600, key=lambda box: box.value)
+        self.assertFalse(heap.is_full())
+        self.check_positions(heap)
+        heap.heapify(boxes[:10])
+        self.check_positions(heap)
+        self.assertNotIn(boxes[10], heap)
+        with self.assertRaises(ValueError):
+            heap.heapify([boxes[0], boxes[0]])
+        heap.heapify([Box(value) for value in range(601)])  # grows past its capacity
+        self.check_positions(heap)
+        self.assertGreaterEqual(heap.capacity(), 601)
+
+    @timeout()
+    @number("11.4")
+    def test_growth(self):
+        random.seed(2505)
+        heap = MaxHeap(0)
+        self.assertEqual(heap.capacity(), 1)
+        values = [random.randrange(1000) for _ in range(1000)]
+        capacities = set()
+        for value in values:
+            heap.add(value)
+            capacities.add(heap.capacity())
+        self.assertEqual(sorted(capacities), [2 ** i for i in range(11)])  # doubles from 1 to 1024
+
+        for _ in range(900):
+            heap.get_max()
+        heap.shrink_to_fit()
+        self.assertEqual(heap.capacity(), 100)
+        heap.reserve(50)
+        self.assertEqual(heap.capacity(), 100)
+        heap.reserve(300)
+        self.assertEqual(heap.capacity(), 300)
+        self.assertEqual([heap.get_max() for _ in range(100)], sorted(values)[:100][::-1])
+
+        indexed = IndexedMaxHeap(1, key=lambda box: box.value)
+        boxes = [Box(value) for value in values[:100]]
+        for box in boxes:
+            indexed.add(box)
+        self.assertIsNot(indexed.keys, indexed.the_array)
+        indexed.shrink_to_fit()
+        self.check_positions(indexed)
+        boxes[3].value = -1
+        indexed.update(boxes[3])
+        self.check_positions(indexed)
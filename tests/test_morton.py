@@ -0,0 +1,53 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from morton import MortonIndex, morton_encode, morton_decode
+from threedeebeetree import ThreeDeeBeeTree
+
+class MortonIndexTest(unittest.TestCase):
+
+    @timeout()
+    @number("10.1")
+    def test_codes_and_lookup(self):
+        self.assertEqual(morton_encode((1, 0, 0)), 4)
+        self.assertEqual(morton_encode((0, 1, 1)), 3)
+        self.assertEqual(morton_encode((3, 0, 0)), 36)
+        for point in [(0, 0, 0), (5, 9, 2), (2 ** 30 + 5, 7, 2 ** 40)]:
+            self.assertEqual(morton_decode(morton_encode(point)), point)
+
+        index = MortonIndex([((3, 4, -5), 'a'), ((1, 1, 1), 'b'), ((3, 4, -5), 'c'), ((-2, 10, 0), 'd')])
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index[(3, 4, -5)], 'c')
+        self.assertEqual(index[(-2, 10, 0)], 'd')
+        self.assertIn((1, 1, 1), index)
+        self.assertNotIn((1, 1, 2), index)
+        self.assertNotIn((-100, 1, 1), index)  # outside the region of the index
+        self.assertIsNone(index.get((1000, 1000, 1000)))
+        with self.assertRaises(KeyError):
+            index[(0, 0, 0)]
+        self.assertEqual(sorted(index), [(-2, 10, 0), (1, 1, 1), (3, 4, -5)])
+        self.assertEqual(len(MortonIndex()), 0)
+        self.assertEqual(list(MortonIndex().range_query((0, 0, 0), (5, 5, 5))), [])
+
+    @timeout()
+    @number("10.2")
+    def test_range_queries(self):
+        random.seed(52001)
+        tdbt = ThreeDeeBeeTree()
+        for i in range(5000):
+            tdbt[(random.randrange(-300, 300), random.randrange(600), random.randrange(100))] = i
+        index = MortonIndex.from_tree(tdbt)
+        self.assertEqual(len(index), len(tdbt))
+
+        for _ in range(100):
+            lo = tuple(random.randrange(-350, 600) for _ in range(3))
+            hi = tuple(axis + random.randrange(300) for axis in lo)
+            expected = sorted(tdbt.range_query(lo, hi))
+            found = list(index.range_query(lo, hi))
+            codes = [index.encode(point) for point, _ in found]
+            self.assertEqual(codes, sorted(codes))  # in Morton order
+            self.assertEqual(sorted(found), expected)
+            self.assertEqual(index.range_count(lo, hi), len(expected))
+        self.assertEqual(index.range_count((-1000, -1000, -1000), (1000, 1000, 1000)), len(tdbt))
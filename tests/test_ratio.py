@@ -3,7 +3,7 @@ import unittest
 from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 
-from ratio import Percentiles
+from ratio import Percentiles, SketchPercentiles
 
 class RatioTest(unittest.TestCase):
 
@@ -39,4 +39,100 @@ class RatioTest(unittest.TestCase):
 
         p.remove_point(82)
         res = p.ratio(13, 10)
-        self.assertSetEqual(set(res), {14, 15, 16, 87, 91})
\ No newline at end of file
+        self.assertSetEqual(set(res), {14, 15, 16, 87, 91})
+
+    @timeout()
+    @number("2.3")
+    def test_from_iterable(self):
+        random.seed(1293810293)
+        points = [4, 9, 14, 15, 16, 82, 87, 91, 92, 99]
+        random.shuffle(points)
+        p = Percentiles.from_iterable(points)
+        res = p.ratio(13, 10)
+        self.assertSetEqual(set(res), {14, 15, 16, 82, 87, 91, 92})
+
+        p.add_point(50)
+        p.remove_point(4)
+        res = p.ratio(0, 42)
+        self.assertSetEqual(set(res), {9, 14, 15, 16, 50})
+
+    @timeout()
+    @number("2.4")
+    def test_band(self):
+        p = Percentiles.from_iterable(range(100, 0, -1))
+        self.assertEqual(list(p.band(13, 10)), list(range(14, 91)))
+        self.assertEqual(p.band_count(13, 10), 77)
+        self.assertEqual(p.band_summary(13, 10), (77, 14, 90))
+        self.assertEqual(p.ratio(13, 10), list(range(14, 91)))
+
+        self.assertEqual(list(p.band(60, 60)), [])
+        self.assertEqual(p.band_count(60, 60), 0)
+        self.assertEqual(p.band_summary(60, 60), (0, None, None))
+        self.assertEqual(p.ratio(0, 0), list(range(1, 101)))
+
+    @timeout()
+    @number("2.5")
+    def test_sketch(self):
+        random.seed(2938742)
+        points = list(range(1, 1001))
+        random.shuffle(points)
+        p = SketchPercentiles(relative_accuracy=0.01)
+        for point in points[:500]:
+            p.add_point(point)
+        other = SketchPercentiles.from_iterable(points[500:])
+        p.merge(other)
+        p.remove_point(1000)
+
+        res = p.ratio(10, 20)
+        self.assertEqual(len(res), p.band_count(10, 20))
+        for approx, exact in zip(res, range(101, 800)):
+            self.assertLessEqual(abs(approx - exact), 0.01 * exact)
+        count, lowest, highest = p.band_summary(10, 20)
+        self.assertEqual(count, len(res))
+        self.assertEqual((lowest, highest), (res[0], res[-1]))
+
+    @timeout()
+    @number("2.6")
+    def test_batches(self):
+        random.seed(2938742)
+        p = Percentiles()
+        points = [4, 9, 14, 15, 16, 82, 87, 91, 92, 99]
+        random.shuffle(points)
+        p.add_points(points)
+        p.remove_points([4, 92])
+
+        res = p.ratio(13, 10)
+        self.assertSetEqual(set(res), {15, 16, 82, 87, 91})
+
+    @timeout()
+    @number("2.7")
+    def test_duplicates(self):
+        p = Percentiles()
+        points = [7] * 50 + [1] * 25 + [9] * 25
+        random.seed(1293810293)
+        random.shuffle(points)
+        for point in points:
+            p.add_point(point)
+
+        self.assertEqual(len(p.store), 100)
+        self.assertEqual(p.store.root.subtree_size, 100)
+        self.assertEqual(p.ratio(20, 70), [1] * 5 + [7] * 5)
+        self.assertEqual(p.band_summary(10, 10), (80, 1, 9))
+
+        p.remove_point(1)
+        p.remove_points([9] * 20)
+        self.assertEqual(p.ratio(0, 0), [1] * 24 + [7] * 50 + [9] * 5)
+
+    @timeout()
+    @number("2.8")
+    def test_sketch_from_iterable_configuration(self):
+        points = list(range(1, 1001))
+        p = SketchPercentiles.from_iterable(points, relative_accuracy=0.05, max_buckets=64)
+        self.assertEqual(p.store.relative_accuracy, 0.05)
+        self.assertLessEqual(len(p.store.positive.counts), 64)
+
+        other = SketchPercentiles(relative_accuracy=0.05)
+        other.add_points(points)
+        other.merge(p)
+        with self.assertRaises(ValueError):
+            SketchPercentiles().merge(p)
@@ -0,0 +1,52 @@
+import random
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from sketch import QuantileSketch
+
+class SketchTest(unittest.TestCase):
+
+    @timeout()
+    @number("7.1")
+    def test_relative_error(self):
+        random.seed(5)
+        values = [random.uniform(-1000, 1000) for _ in range(10000)] + [0] * 10
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for v in values:
+            sketch.add(v)
+        values.sort()
+
+        self.assertEqual(len(sketch), len(values))
+        for k in (1, 100, 4000, 5005, 9999, len(values)):
+            expected = values[k - 1]
+            self.assertLessEqual(abs(sketch.value_at_rank(k) - expected), 0.01 * abs(expected) + 1e-9)
+        self.assertAlmostEqual(sketch.quantile(0.5), values[len(values) // 2], delta=0.01 * 1000)
+
+        for v in values[:5000]:
+            sketch.remove(v)
+        self.assertEqual(len(sketch), len(values) - 5000)
+        expected = values[5000]
+        self.assertLessEqual(abs(sketch.value_at_rank(1) - expected), 0.01 * abs(expected) + 1e-9)
+        with self.assertRaises(ValueError):
+            sketch.remove(123456789)
+
+    @timeout()
+    @number("7.2")
+    def test_merge_and_bounds(self):
+        left, right, whole = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for v in range(1, 2001):
+            (left if v % 2 else right).add(v)
+            whole.add(v)
+        left.merge(right)
+        self.assertEqual(list(left), list(whole))
+
+        with self.assertRaises(ValueError):
+            left.merge(QuantileSketch(relative_accuracy=0.05))
+
+        small = QuantileSketch(relative_accuracy=0.01, max_buckets=50)
+        for v in range(1, 100001):
+            small.add(v)
+        self.assertLessEqual(len(small.positive), 50)
+        self.assertEqual(len(small), 100000)
+        self.assertLessEqual(abs(small.value_at_rank(99000) - 99000), 0.01 * 99000)
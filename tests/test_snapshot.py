@@ -0,0 +1,91 @@
+import os
+import random
+import tempfile
+import unittest
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from avl import AVLTree
+from bst import BinarySearchTree
+from threedeebeetree import ThreeDeeBeeTree
+from snapshot import dump_bst, load_bst, MappedBinarySearchTree, dump_tdbt, load_tdbt, MappedThreeDeeBeeTree
+
+def same_shape(test: unittest.TestCase, a, b):
+    if a is None or b is None:
+        test.assertIs(a, b)
+        return
+    test.assertEqual((a.key, a.item, a.subtree_size, a.count), (b.key, b.item, b.subtree_size, b.count))
+    same_shape(test, a.left, b.left)
+    same_shape(test, a.right, b.right)
+
+def same_octants(test: unittest.TestCase, a, b):
+    if a is None or b is None:
+        test.assertIs(a, b)
+        return
+    test.assertEqual((a.key, a.item, a.subtree_size), (b.key, b.item, b.subtree_size))
+    for child_a, child_b in zip(a.children, b.children):
+        same_octants(test, child_a, child_b)
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    @timeout()
+    @number("9.1")
+    def test_bst(self):
+        random.seed(9)
+        tree = AVLTree(multiset=True)
+        for _ in range(500):
+            k = random.randrange(200)
+            tree[k] = str(k)
+
+        dump_bst(tree, self.path)
+        loaded = load_bst(self.path, AVLTree)
+        same_shape(self, tree.root, loaded.root)
+        self.assertEqual(len(loaded), 500)
+        self.assertTrue(loaded.multiset)
+        self.assertEqual(loaded.root.height, tree.root.height)
+        loaded[1000] = 'new'
+        self.assertEqual(loaded.kth_smallest(501, loaded.root).key, 1000)
+
+        with MappedBinarySearchTree(self.path) as mapped:
+            self.assertEqual(len(mapped), 500)
+            for k in (0, 57, 199):
+                if k in tree:
+                    self.assertEqual(mapped[k], str(k))
+            self.assertNotIn(-1, mapped)
+            for rank in (1, 250, 500):
+                node = tree.kth_smallest(rank, tree.root)
+                self.assertEqual(mapped.kth_smallest(rank), (node.key, node.item))
+
+        dump_bst(BinarySearchTree(), self.path)
+        self.assertTrue(load_bst(self.path).is_empty())
+
+    @timeout()
+    @number("9.2")
+    def test_tdbt(self):
+        random.seed(10)
+        tree = ThreeDeeBeeTree()
+        points = [tuple(random.randrange(-100, 100) for _ in range(3)) for _ in range(300)]
+        points = list(dict.fromkeys(points))
+        for i, point in enumerate(points):
+            tree[point] = i
+
+        dump_tdbt(tree, self.path)
+        loaded = load_tdbt(self.path)
+        self.assertEqual(len(loaded), len(points))
+        self.assertEqual(loaded.root.subtree_size, len(points))
+        same_octants(self, tree.root, loaded.root)
+        with self.assertRaises(ValueError):
+            load_bst(self.path)
+
+        with MappedThreeDeeBeeTree(self.path) as mapped:
+            self.assertEqual(len(mapped), len(points))
+            for i, point in enumerate(points):
+                self.assertEqual(mapped[point], i)
+            self.assertNotIn((1000, 1000, 1000), mapped)
@@ -1,9 +1,15 @@
+import random
 import unittest
 from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 
 from threedeebeetree import ThreeDeeBeeTree
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class TestThreeDeeBeeTree(unittest.TestCase):
 
     TESTING_POINTS = [
@@ -64,3 +70,169 @@ class TestThreeDeeBeeTree(unittest.TestCase):
         
         self.assertEqual(tdbt.get_tree_node_by_key((16, 0, -14)).item, 7)
         self.assertEqual(tdbt.get_tree_node_by_key((6, -1, -17)).item, 0)
+
+    @timeout()
+    @number("3.4")
+    def test_deep_lookup(self):
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i
+
+        # (-18, 7, 5) sits two levels below the root
+        self.assertEqual(tdbt[(-18, 7, 5)], 6)
+        for i, point in enumerate(self.TESTING_POINTS):
+            self.assertIn(point, tdbt)
+            self.assertEqual(tdbt[point], i)
+        self.assertNotIn((0, 0, 0), tdbt)
+        with self.assertRaises(KeyError):
+            tdbt[(-18, 7, 6)]
+
+        self.assertEqual(tdbt.get((5, 5, 7)), 2)
+        self.assertEqual(tdbt.get((5, 5, 8), "missing"), "missing")
+        self.assertEqual(
+            tdbt.contains_many([(4, 6, 19), (4, 6, 18), (-6, -14, 12)]),
+            [True, False, True],
+        )
+
+    @timeout()
+    @number("3.5")
+    def test_range(self):
+        random.seed(3)
+        tdbt = ThreeDeeBeeTree()
+        points = list(dict.fromkeys(
+            tuple(random.randrange(-50, 50) for _ in range(3)) for _ in range(2000)
+        ))
+        for i, point in enumerate(points):
+            tdbt[point] = i
+
+        for lo, hi in [((-10, -10, -10), (10, 10, 10)), ((0, -50, 5), (49, 0, 49)),
+                       ((-50, -50, -50), (49, 49, 49)), ((60, 0, 0), (70, 10, 10))]:
+            inside = {p: i for i, p in enumerate(points)
+                      if all(lo[a] <= p[a] <= hi[a] for a in range(3))}
+            self.assertEqual(dict(tdbt.range_query(lo, hi)), inside)
+            self.assertEqual(tdbt.range_count(lo, hi), len(inside))
+
+    @timeout()
+    @number("3.6")
+    def test_nearest(self):
+        random.seed(4)
+        tdbt = ThreeDeeBeeTree()
+        points = list(dict.fromkeys(
+            tuple(random.randrange(-100, 100) for _ in range(3)) for _ in range(2000)
+        ))
+        for i, point in enumerate(points):
+            tdbt[point] = i
+
+        metrics = {
+            'euclidean': lambda a, b: sum((a[i] - b[i]) ** 2 for i in range(3)) ** 0.5,
+            'manhattan': lambda a, b: sum(abs(a[i] - b[i]) for i in range(3)),
+            'chebyshev': lambda a, b: max(abs(a[i] - b[i]) for i in range(3)),
+        }
+        for name, dist in metrics.items():
+            for query in [(0, 0, 0), (99, -100, 37), (250, 250, 250)]:
+                result = tdbt.k_nearest(query, 5, name)
+                expected = sorted(dist(query, p) for p in points)[:5]
+                self.assertEqual(len(result), 5)
+                for (d, point, item), e in zip(result, expected):
+                    self.assertAlmostEqual(d, e)
+                    self.assertAlmostEqual(dist(query, point), d)
+                    self.assertEqual(points[item], point)
+
+                inside = {p for p in points if dist(query, p) <= 30}
+                self.assertSetEqual({p for p, _ in tdbt.within_distance(query, 30, name)}, inside)
+
+        self.assertEqual(ThreeDeeBeeTree().k_nearest((0, 0, 0), 3), [])
+        self.assertEqual(len(tdbt.k_nearest((0, 0, 0), len(points) + 10)), len(points))
+
+    @timeout()
+    @number("3.7")
+    def test_delete_and_update(self):
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i
+
+        tdbt[(5, 5, 7)] = "updated"
+        self.assertEqual(len(tdbt), 10)
+        self.assertEqual(tdbt.root.subtree_size, 10)
+        self.assertEqual(tdbt[(5, 5, 7)], "updated")
+
+        child = tdbt.root.get_child_for_key((-11, 4, -16))
+        del tdbt[(-11, 4, -16)]  # has a subtree of 6
+        self.assertEqual(len(tdbt), 9)
+        self.assertEqual(tdbt.root.subtree_size, 9)
+        self.assertNotIn((-11, 4, -16), tdbt)
+        self.assertEqual(tdbt.root.get_child_for_key((-11, 4, -16)).subtree_size, 5)
+        for i, point in enumerate(self.TESTING_POINTS):
+            if point == (5, 5, 7):
+                self.assertEqual(tdbt[point], "updated")
+            elif point != (-11, 4, -16):
+                self.assertEqual(tdbt[point], i)
+
+        del tdbt[(6, -1, -17)]  # the root
+        self.assertEqual(len(tdbt), 8)
+        self.assertEqual(tdbt.root.subtree_size, 8)
+        with self.assertRaises(KeyError):
+            del tdbt[(6, -1, -17)]
+
+        random.seed(14)
+        points = list(dict.fromkeys(
+            tuple(random.randrange(-30, 30) for _ in range(3)) for _ in range(500)
+        ))
+        tdbt = ThreeDeeBeeTree()
+        for point in points:
+            tdbt[point] = point
+        for point in points[::2]:
+            del tdbt[point]
+        for node in tdbt.iter_subtree(tdbt.root):
+            self.assertEqual(node.subtree_size, 1 + sum(c.subtree_size for c in node.children if c))
+        self.assertEqual(tdbt.range_count((-30, -30, -30), (30, 30, 30)), len(points[1::2]))
+        self.assertTrue(all(tdbt.contains_many(points[1::2])))
+        self.assertFalse(any(tdbt.contains_many(points[::2])))
+
+    @timeout()
+    @number("3.8")
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_insert_array(self):
+        random.seed(16)
+        rows = [tuple(random.randrange(-10, 10) for _ in range(3)) for _ in range(3000)]
+        items = list(range(len(rows)))
+
+        expected = ThreeDeeBeeTree()
+        for point, item in zip(self.TESTING_POINTS + rows, range(-10, len(rows))):
+            expected[point] = item
+
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i - 10
+        tdbt.insert_array(numpy.array(rows), items)
+
+        self.assertEqual(len(tdbt), len(expected))
+        pending = [(tdbt.root, expected.root)]
+        while pending:
+            actual, wanted = pending.pop()
+            self.assertEqual((actual.key, actual.item, actual.subtree_size),
+                             (wanted.key, wanted.item, wanted.subtree_size))
+            for a, w in zip(actual.children, wanted.children):
+                self.assertEqual(a is None, w is None)
+                if a is not None:
+                    pending.append((a, w))
+
+        fresh = ThreeDeeBeeTree()
+        fresh.insert_array(numpy.array(rows))
+        self.assertEqual(len(fresh), len(set(rows)))
+        self.assertEqual(fresh.root.key, rows[0])
+        self.assertIsNone(fresh[rows[5]])
+
+    @timeout()
+    @number("3.9")
+    def test_compact_nodes(self):
+        tdbt = ThreeDeeBeeTree()
+        for i, point in enumerate(self.TESTING_POINTS):
+            tdbt[point] = i
+
+        leaf = tdbt.get_tree_node_by_key((4, 6, 19))
+        self.assertIsNone(leaf.child_slots)
+        self.assertEqual(list(leaf.children), [None] * 8)
+        self.assertIsNone(leaf.get_child_for_key((0, 0, 0)))
+        self.assertFalse(hasattr(leaf, "__dict__"))
+        self.assertIsNotNone(tdbt.root.child_slots)
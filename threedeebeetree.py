@@ -1,17 +1,49 @@
 from __future__ import annotations
-from typing import Generic, TypeVar, Tuple
-from dataclasses import dataclass, field
+from typing import Generic, TypeVar, Tuple, Iterable, Iterator, Callable, Sequence
+from dataclasses import dataclass
+from math import inf, sqrt
+from heapq import heappush, heappop, heapreplace
 
 I = TypeVar('I')
 Point = Tuple[int, int, int]
+# Region of space covered by a subtree: lower bounds (inclusive) and upper bounds (exclusive)
+Cell = Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+WHOLE_SPACE: Cell = ((-inf, -inf, -inf), (inf, inf, inf))
 
-@dataclass
+# Children of a node without any, shared instead of allocating eight empty slots per leaf
+NO_CHILDREN: tuple[None, ...] = (None,) * 8
+
+@dataclass(slots=True)
 class BeeNode:
 
     key: Point
     item: I
     subtree_size: int = 1
-    children: list[BeeNode | None] = field(default_factory=lambda: [None]*8)
+    # The eight octant slots, only allocated once the node gets its first child
+    child_slots: list[BeeNode | None] | None = None
+    # subtree_size when the subtree was last built in balance (0 if it never was), see rebalance_path
+    built_size: int = 0
+
+    @property
+    def children(self) -> Sequence[BeeNode | None]:
+        """
+        The child of every octant (None for an empty octant), read only: use set_child to change one.
+
+        Complexity : O(1)
+        """
+        return self.child_slots if self.child_slots is not None else NO_CHILDREN
+
+    def set_child(self, index: int, child: BeeNode | None) -> None:
+        """
+        Sets the child of octant index, allocating the octant slots on the first child.
+
+        Complexity : O(1)
+        """
+        if self.child_slots is None:
+            if child is None:
+                return
+            self.child_slots = [None] * 8
+        self.child_slots[index] = child
 
     def get_octant_index(self, point: Point) -> int:
         """
@@ -46,16 +78,98 @@ class BeeNode:
                      at that index. It doesn't need to traverse or search through the tree or the list of children.
         
         """
+        if self.child_slots is None:
+            return None
         index = self.get_octant_index(point)
-        return self.children[index]
+        return self.child_slots[index]
+
+
+# SAME_SIDE[octant][axis] lists the octants on the same side of the given axis as octant
+SAME_SIDE = [[[other for other in range(8) if not (other ^ octant) & bit] for bit in (4, 2, 1)]
+             for octant in range(8)]
+
+
+def child_cell(key: Point, octant: int, cell: Cell) -> Cell:
+    """
+    Returns the region covered by the given octant of a node at key whose own region is cell.
+    A set bit of the octant index (4 for x, 2 for y, 1 for z) means the coordinate is >= key,
+    which raises the lower bound, otherwise the coordinate is < key, which lowers the upper bound.
+
+    Complexity : O(1)
+    """
+    lower, upper = list(cell[0]), list(cell[1])
+    for axis, bit in enumerate((4, 2, 1)):
+        if octant & bit:
+            lower[axis] = key[axis]
+        else:
+            upper[axis] = key[axis]
+    return tuple(lower), tuple(upper)
+
+
+def cell_inside_box(cell: Cell, lo: Point, hi: Point) -> bool:
+    """
+    Checks whether every integer point of the cell lies in the box lo <= p <= hi.
+
+    Complexity : O(1)
+    """
+    lower, upper = cell
+    return all(lo[axis] <= lower[axis] and upper[axis] - 1 <= hi[axis] for axis in range(3))
+
+
+def cell_meets_box(cell: Cell, lo: Point, hi: Point) -> bool:
+    """
+    Checks whether the cell and the box lo <= p <= hi can share a point.
+
+    Complexity : O(1)
+    """
+    lower, upper = cell
+    return all(lo[axis] < upper[axis] and lower[axis] <= hi[axis] for axis in range(3))
+
+
+# Distance metrics, each combining the absolute per-axis differences between two points
+METRICS: dict[str, Callable[[tuple[float, float, float]], float]] = {
+    'euclidean': lambda deltas: sqrt(deltas[0] ** 2 + deltas[1] ** 2 + deltas[2] ** 2),
+    'manhattan': lambda deltas: deltas[0] + deltas[1] + deltas[2],
+    'chebyshev': lambda deltas: max(deltas),
+}
+
+
+def point_deltas(a: Point, b: Point) -> tuple[int, int, int]:
+    """
+    Absolute per-axis differences between two points.
+
+    Complexity : O(1)
+    """
+    return abs(a[0] - b[0]), abs(a[1] - b[1]), abs(a[2] - b[2])
+
+
+def cell_deltas(point: Point, cell: Cell) -> tuple[float, float, float]:
+    """
+    Per-axis distances from point to the closest integer point of cell (0 on the axes where
+    the point lies within the cell's bounds).
+
+    Complexity : O(1)
+    """
+    lower, upper = cell
+    return tuple(max(lower[axis] - point[axis], point[axis] - (upper[axis] - 1), 0) for axis in range(3))
 
 
 class ThreeDeeBeeTree(Generic[I]):
     """ 3️⃣🇩🐝🌳 tree. """
 
-    def __init__(self) -> None:
+    # A node is out of balance when one side of an axis holds more than MAX_RATIO times the
+    # points of the other side, once the larger side holds at least MIN_SIDE points
+    MAX_RATIO = 7
+    MIN_SIDE = 19
+
+    def __init__(self, rebalance: bool = False) -> None:
+        """
+        If rebalance is True, every insertion through __setitem__ that leaves a node on its path out
+        of balance rebuilds the subtree of the highest such node (scapegoat style).
+        """
         self.root = None
         self.length = 0
+        self.rebalance = rebalance
 
     def is_empty(self) -> bool:
         return len(self) == 0
@@ -84,7 +198,7 @@ class ThreeDeeBeeTree(Generic[I]):
         
         Worst case : The worst case scenario would be if the key we're looking for is located at one 
                      of the leaf nodes of the tree, in which case we would have to traverse down to the leaf 
-                     level of the Octree. The number of steps it takes to reach a leaf node is proportional to the 
+                     level of the Octree, following the octant of the key at each level. The number of steps it takes to reach a leaf node is proportional to the 
                      height of the tree. For a balanced Octree, this would result in a worst case time complexity of O(log n). 
                      However, in an unbalanced Octree, it can degrade to O(n), where n is the number of nodes in the tree.
         
@@ -93,20 +207,43 @@ class ThreeDeeBeeTree(Generic[I]):
         while current is not None:
             if current.key == key:
                 return current
-            else:
-                for child in current.children:
-                    if child is not None and child.key == key:
-                        current = child
-                        break
-                else:
-                    raise KeyError('Key not found in tree')
+            current = current.get_child_for_key(key)
         raise KeyError('Key not found in tree')
 
+    def get(self, key: Point, default: I | None = None) -> I | None:
+        """
+        Returns the item stored at key, or default if the key is not in the tree.
+
+        Complexity : see get_tree_node_by_key
+        """
+        try:
+            return self.get_tree_node_by_key(key).item
+        except KeyError:
+            return default
+
+    def contains_many(self, keys: Iterable[Point]) -> list[bool]:
+        """
+        Checks a batch of keys at once, returning one flag per key (in order).
+
+        Complexity : O(k * D) where k is the number of keys and D the depth of the tree, as each
+                     key follows its own octant path from the root.
+        """
+        root = self.root
+        found = []
+        for key in keys:
+            current = root
+            while current is not None and current.key != key:
+                current = current.get_child_for_key(key)
+            found.append(current is not None)
+        return found
+
     def __setitem__(self, key: Point, item: I) -> None:
 
         """
         Complexity :
 
+        Setting an existing key replaces its item in place, without adding a node.
+
         Best case : The best case scenario occurs when there is no root (the tree is empty), 
                     in which case the operation takes constant time, O(1), to set the root.
 
@@ -120,35 +257,418 @@ class ThreeDeeBeeTree(Generic[I]):
         """
         if self.root is None:
             self.root = BeeNode(key, item, subtree_size=1)  # Consider root in the subtree size
+            self.length += 1
         else:
-            self.root = self.insert_aux(self.root, key, item)
-        self.root.subtree_size = 1 + sum(c.subtree_size for c in self.root.children if c is not None)  # update root's subtree_size
-        self.length += 1
+            path = self.insert_node(self.root, key, item)
+            if path is not None:
+                self.length += 1
+                if self.rebalance:
+                    self.rebalance_path(path, key)
 
-    def insert_aux(self, current: BeeNode, key: Point, item: I) -> BeeNode:
+    def insert_array(self, points, items: Sequence[I] | None = None) -> None:
         """
+        Inserts every row of an (N, 3) integer NumPy array (or anything numpy.asarray accepts),
+        with items[i] as the item of row i (None if items is not given). The resulting tree is the
+        one inserting the rows one by one would give, repeated points included.
+
+        Rather than descending once per point, all pending points move down one level at a time:
+        their octant codes relative to the node each one has reached are computed with array
+        operations, and a stable sort by (node, octant) groups them so the first point of every
+        group reaching an empty octant becomes the node there. Sizes are added up once at the end.
+
         Complexity :
 
-        Best case : The best case scenario occurs when the key to be inserted corresponds to an empty child 
-                    of the current node. In this case, the function just inserts the new node and updates the 
-                    subtree_size which takes constant time. Thus, the best case time complexity is O(1).
-        
-        Worst case : The worst case scenario happens when the tree is filled and the new key to be inserted is 
-                     located at a leaf node of the tree. The function would have to traverse down to the leaf level of the Octree. 
-                     The time complexity of this operation is dependent on the depth of the tree. In a balanced Octree, the depth 
-                     is proportional to log(n) where n is the number of nodes. So, in the worst case, the time complexity would be 
-                     O(log n). However, for an unbalanced Octree, the time complexity can degrade to O(n), where n is the number of 
-                     nodes in the tree.
-        
+        Best case = Worst case : O(N log N) array work per level of the tree (for the grouping sort),
+                                 so O(D * N log N) where D is the depth reached, plus O(1) interpreter
+                                 work per node created or passed through.
+        """
+        import numpy as np  # only needed for this ingestion path
+
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] != 3:
+            raise ValueError('Points should be an (N, 3) array.')
+        if len(points) == 0:
+            return
+
+        table = []      # every node created or passed through, level by level
+        parents = []    # position in table of the parent of each node (-1 for the root)
+        created = []    # whether each node was created by this call
+        pending = np.arange(len(points))
+        if self.root is None:
+            self.root = BeeNode(tuple(int(c) for c in points[0]), items[0] if items is not None else None, subtree_size=0)
+            created.append(True)
+            pending = pending[1:]
+        else:
+            created.append(False)
+        table.append(self.root)
+        parents.append(-1)
+
+        level = [0]  # positions in table of the nodes pending points have reached
+        at = np.zeros(len(pending), dtype=np.int64)  # index into level for every pending point
+        while len(pending) > 0:
+            keys = np.array([table[t].key for t in level], dtype=points.dtype)[at]
+            coords = points[pending]
+
+            same = (coords == keys).all(axis=1)
+            for j in np.flatnonzero(same):  # in arrival order, so the last item wins
+                table[level[at[j]]].item = items[pending[j]] if items is not None else None
+            keep = ~same
+            pending, at, coords, keys = pending[keep], at[keep], coords[keep], keys[keep]
+            if len(pending) == 0:
+                break
+
+            codes = ((coords[:, 0] >= keys[:, 0]).astype(np.int64) << 2) \
+                | ((coords[:, 1] >= keys[:, 1]).astype(np.int64) << 1) \
+                | (coords[:, 2] >= keys[:, 2]).astype(np.int64)
+            groups = at * 8 + codes
+            order = np.argsort(groups, kind='stable')
+            pending, at, groups = pending[order], at[order], groups[order]
+            starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+            ends = np.r_[starts[1:], len(groups)]
+
+            next_level = []
+            next_at = np.empty(len(pending), dtype=np.int64)
+            consumed = np.zeros(len(pending), dtype=bool)
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                parent = level[at[start]]
+                octant = int(groups[start] & 7)
+                child = table[parent].children[octant]
+                is_new = child is None
+                if is_new:
+                    row = pending[start]
+                    child = BeeNode(tuple(int(c) for c in points[row]),
+                                    items[row] if items is not None else None, subtree_size=0)
+                    table[parent].set_child(octant, child)
+                    consumed[start] = True
+                created.append(is_new)
+                table.append(child)
+                parents.append(parent)
+                next_at[start:end] = len(next_level)
+                next_level.append(len(table) - 1)
+            pending, at, level = pending[~consumed], next_at[~consumed], next_level
+
+        added = [1 if new else 0 for new in created]
+        for t in range(len(table) - 1, -1, -1):  # children come after their parents
+            table[t].subtree_size += added[t]
+            if parents[t] >= 0:
+                added[parents[t]] += added[t]
+        self.length += added[0]
+
+    def __delitem__(self, key: Point) -> None:
         """
-        index = current.get_octant_index(key)
-        if current.children[index] is None:
-            current.children[index] = BeeNode(key, item, subtree_size=1)
+        Deletes the point key. Its subtree is rebuilt from the remaining points of that subtree
+        only, re-inserted in pre-order so they keep their relative layout as far as possible, and
+        the subtree_size of every ancestor is decremented.
+
+        Complexity :
+
+        Best case : O(D) where D is the depth of the key, when it is a leaf.
+
+        Worst case : O(D + m * d) where m is the size of the subtree of the key and d the depth of
+                     the rebuilt subtree, as every remaining point of the subtree is re-inserted.
+        """
+        path = []
+        current = self.root
+        while current is not None and current.key != key:
+            path.append(current)
+            current = current.get_child_for_key(key)
+        if current is None:
+            raise KeyError('Key not found in tree')
+
+        remaining = self.iter_subtree(current)
+        next(remaining)  # skip the deleted node itself
+        replacement = self.build_subtree((node.key, node.item) for node in list(remaining))
+        if not path:
+            self.root = replacement
         else:
-            current.children[index] = self.insert_aux(current.children[index], key, item)
-        current.subtree_size = 1 + sum(c.subtree_size for c in current.children if c is not None)  # update current node's subtree_size
+            parent = path[-1]
+            parent.set_child(parent.get_octant_index(key), replacement)
+        for node in path:
+            node.subtree_size -= 1
+        self.length -= 1
+
+    def build_subtree(self, pairs: Iterable[tuple[Point, I]]) -> BeeNode | None:
+        """
+        Builds a detached subtree by inserting the (point, item) pairs in order, and returns its root.
+
+        Complexity : O(m * d) where m is the number of pairs and d the depth of the subtree built.
+        """
+        root = None
+        for key, item in pairs:
+            if root is None:
+                root = BeeNode(key, item, subtree_size=1)
+            else:
+                root = self.insert_aux(root, key, item)
+        return root
+
+    def insert_aux(self, current: BeeNode | None, key: Point, item: I) -> BeeNode:
+        """
+        Inserts (or updates) key in the subtree rooted at current and returns the root of the subtree.
+
+        Complexity : O(1) if the subtree is empty, otherwise see insert_node.
+        """
+        if current is None:
+            return BeeNode(key, item, subtree_size=1)
+        self.insert_node(current, key, item)
         return current
-    
+
+    def insert_node(self, current: BeeNode, key: Point, item: I) -> list[BeeNode] | None:
+        """
+        Inserts key below current, or replaces its item if it is already there. The descent is a
+        loop which remembers the nodes passed, and once the key is known to be new their
+        subtree_size is incremented by one each, rather than recomputed from their eight children.
+        Returns the nodes passed on the way down to the new node, or None if key was already there.
+
+        Complexity :
+
+        Best case : The best case scenario occurs when the key is at current, or belongs in an empty
+                    child of current, so only a constant amount of work is done: O(1).
+
+        Worst case : The worst case scenario happens when the new key belongs below the deepest leaf
+                     of the subtree, so the whole depth D of the Octree is descended and then climbed back
+                     with one increment per level: O(D), which is O(log n) for a balanced Octree and O(n)
+                     for an unbalanced one.
+        """
+        path = []
+        while True:
+            if current.key == key:
+                current.item = item
+                return None
+            path.append(current)
+            index = current.get_octant_index(key)
+            slots = current.child_slots
+            child = slots[index] if slots is not None else None
+            if child is None:
+                current.set_child(index, BeeNode(key, item, subtree_size=1))
+                break
+            current = child
+        for node in path:
+            node.subtree_size += 1
+        return path
+
+    def is_unbalanced(self, current: BeeNode, octant: int, key: Point | None = None) -> bool:
+        """
+        Checks whether, on some axis, the side of current holding the given octant has more than
+        MAX_RATIO times the points of the other side (once it has at least MIN_SIDE points).
+        After an insertion through octant only that side can have grown, so it is the only one
+        which needs checking; the other side is what remains of subtree_size.
+
+        Axes the subtree may not be able to split are skipped: if the other side is empty and the
+        grown side is the one at or above current, all its points may tie with current on that
+        axis (e.g. points on a plane), and no rebuild would move them. The axis only counts once
+        a point is known to differ from current on it: the key just inserted, if given.
+
+        Complexity : O(1)
+        """
+        rest = current.subtree_size - 1
+        if rest < self.MIN_SIDE:
+            return False
+        sizes = [child.subtree_size if child is not None else 0 for child in current.child_slots]
+        limit = self.MAX_RATIO * rest // (self.MAX_RATIO + 1)  # side > limit <=> side > MAX_RATIO * (rest - side)
+        for axis, same_side in enumerate(SAME_SIDE[octant]):
+            side = sizes[same_side[0]] + sizes[same_side[1]] + sizes[same_side[2]] + sizes[same_side[3]]
+            if side > limit and side >= self.MIN_SIDE:
+                if side < rest or not octant & (4 >> axis) or \
+                        key is not None and key[axis] != current.key[axis]:
+                    return True
+        return False
+
+    def rebalance_path(self, path: list[BeeNode], key: Point) -> None:
+        """
+        Rebuilds, with balancing.build_balanced, the subtree of the highest node on the path to a
+        newly inserted key which is out of balance (if any), as a scapegoat tree does.
+
+        Points tied with a node on some axis all go to the same side of it, so some subtrees (e.g.
+        of points on a plane) stay out of balance however they are built. So that these are not
+        rebuilt on every insertion, a subtree built in balance is only rebuilt again once it has
+        received half as many insertions as it held (built_size) when it was built, and a
+        rebuild which would neither lower the depth of the subtree nor bring its root in balance
+        is dropped, only renewing that budget. Either way the O(m log m) rebuild of a subtree of
+        m points is paid for by m / 2 insertions.
+
+        Complexity :
+
+        Best case : O(D) where D is the length of the path, when no node is out of balance.
+
+        Worst case : O(D + m log m) where m is the size of the subtree rebuilt, which is
+                     O(D log n) amortised, as each insertion pays towards rebuilding the subtrees
+                     of the D nodes it passes.
+        """
+        for i, current in enumerate(path):
+            if 2 * (current.subtree_size - current.built_size) >= current.built_size and \
+                    self.is_unbalanced(current, current.get_octant_index(key), key):
+                break
+        else:
+            return
+
+        from balancing import build_balanced  # balancing imports this module
+        nodes = list(self.iter_subtree(current))
+        replacement = build_balanced([node.key for node in nodes], [node.item for node in nodes])
+        if self.depth(replacement) >= self.depth(current) and \
+                any(self.is_unbalanced(replacement, octant) for octant in range(8)):
+            for node in nodes:  # keep the subtree, but renew its budget
+                node.built_size = node.subtree_size
+            return
+        for node in self.iter_subtree(replacement):
+            node.built_size = node.subtree_size
+        if i == 0:
+            self.root = replacement
+        else:
+            parent = path[i - 1]
+            parent.set_child(parent.get_octant_index(current.key), replacement)
+
+    def depth(self, current: BeeNode | None) -> int:
+        """
+        Returns the number of nodes on the longest path down from current (0 if it is None).
+
+        Complexity : O(m) where m is the size of the subtree.
+        """
+        deepest = 0
+        stack = [(current, 1)] if current is not None else []
+        while stack:
+            node, level = stack.pop()
+            deepest = max(deepest, level)
+            stack.extend((child, level + 1) for child in node.children if child is not None)
+        return deepest
+
+    def iter_subtree(self, current: BeeNode | None) -> Iterator[BeeNode]:
+        """
+        Lazily iterates over the nodes of the subtree rooted at current (in pre-order).
+
+        Complexity : O(1) amortised per node.
+        """
+        stack = [current] if current is not None else []
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(child for child in current.children if child is not None)
+
+    def range_query(self, lo: Point, hi: Point) -> Iterator[tuple[Point, I]]:
+        """
+        Lazily iterates over the (point, item) pairs with lo <= point <= hi on every axis.
+        Octants whose region misses the box are skipped, and subtrees whose region lies inside
+        the box are walked without checking their points.
+
+        Complexity :
+
+        Best case : O(1) when the box misses every octant of the root.
+
+        Worst case : O(n) when the box covers most points, and for boxes covering little of a
+                     balanced tree, proportional to the points returned plus the nodes whose
+                     region crosses the boundary of the box.
+        """
+        stack = [(self.root, WHOLE_SPACE)] if self.root is not None else []
+        while stack:
+            current, cell = stack.pop()
+            if cell_inside_box(cell, lo, hi):
+                for node in self.iter_subtree(current):
+                    yield node.key, node.item
+                continue
+            if all(lo[axis] <= current.key[axis] <= hi[axis] for axis in range(3)):
+                yield current.key, current.item
+            for octant, child in enumerate(current.children):
+                if child is not None:
+                    sub_cell = child_cell(current.key, octant, cell)
+                    if cell_meets_box(sub_cell, lo, hi):
+                        stack.append((child, sub_cell))
+
+    def range_count(self, lo: Point, hi: Point) -> int:
+        """
+        Counts the points with lo <= point <= hi on every axis, adding the subtree_size of every
+        subtree whose region lies inside the box instead of visiting it.
+
+        Complexity :
+
+        Best case : O(1) when the box misses, or contains, the region of every octant of the root.
+
+        Worst case : O(n) for a degenerate tree, but only the nodes whose region crosses the
+                     boundary of the box are visited, so for a balanced tree this is sublinear.
+        """
+        count = 0
+        stack = [(self.root, WHOLE_SPACE)] if self.root is not None else []
+        while stack:
+            current, cell = stack.pop()
+            if cell_inside_box(cell, lo, hi):
+                count += current.subtree_size
+                continue
+            if all(lo[axis] <= current.key[axis] <= hi[axis] for axis in range(3)):
+                count += 1
+            for octant, child in enumerate(current.children):
+                if child is not None:
+                    sub_cell = child_cell(current.key, octant, cell)
+                    if cell_meets_box(sub_cell, lo, hi):
+                        stack.append((child, sub_cell))
+        return count
+
+    def k_nearest(self, point: Point, k: int,
+                  metric: str | Callable[[tuple[float, float, float]], float] = 'euclidean'
+                  ) -> list[tuple[float, Point, I]]:
+        """
+        Returns the (distance, point, item) triples of the k points closest to point, closest
+        first. The metric is a name from METRICS or a function of the absolute per-axis differences
+        which never decreases when a difference grows.
+        Octants are explored best-first by the distance to their region, and the search stops as
+        soon as the closest unexplored region is further than the kth best point found so far.
+
+        Complexity :
+
+        Best case : O(k log k) when the k points are found among the first nodes visited and every
+                    other region is further away.
+
+        Worst case : O(n log n) when the regions of most nodes are closer to point than the kth
+                     nearest point (e.g. for a degenerate tree or a very large k). For a balanced tree
+                     and small k only the nodes around point are visited, which is about O(log n).
+        """
+        distance = METRICS[metric] if isinstance(metric, str) else metric
+        if k <= 0 or self.root is None:
+            return []
+        found = []  # max-heap of the best k so far, as (-distance, tie, key, item)
+        frontier = [(0, 0, self.root, WHOLE_SPACE)]
+        tie = 1
+        while frontier:
+            bound, _, current, cell = heappop(frontier)
+            if len(found) == k and bound > -found[0][0]:
+                break
+            current_distance = distance(point_deltas(point, current.key))
+            if len(found) < k:
+                heappush(found, (-current_distance, tie, current.key, current.item))
+            elif current_distance < -found[0][0]:
+                heapreplace(found, (-current_distance, tie, current.key, current.item))
+            for octant, child in enumerate(current.children):
+                if child is not None:
+                    sub_cell = child_cell(current.key, octant, cell)
+                    sub_bound = distance(cell_deltas(point, sub_cell))
+                    if len(found) < k or sub_bound <= -found[0][0]:
+                        tie += 1
+                        heappush(frontier, (sub_bound, tie, child, sub_cell))
+        return [(-negated, key, item) for negated, _, key, item in sorted(found, reverse=True)]
+
+    def within_distance(self, point: Point, radius: float,
+                        metric: str | Callable[[tuple[float, float, float]], float] = 'euclidean'
+                        ) -> Iterator[tuple[Point, I]]:
+        """
+        Lazily iterates over the (point, item) pairs at distance at most radius from point, skipping
+        every octant whose region is further than radius (see k_nearest for the metric).
+
+        Complexity :
+
+        Best case : O(1) when every octant of the root is further than radius.
+
+        Worst case : O(n) when the ball covers most regions, otherwise proportional to the points
+                     returned plus the nodes whose region crosses the sphere.
+        """
+        distance = METRICS[metric] if isinstance(metric, str) else metric
+        stack = [(self.root, WHOLE_SPACE)] if self.root is not None else []
+        while stack:
+            current, cell = stack.pop()
+            if distance(point_deltas(point, current.key)) <= radius:
+                yield current.key, current.item
+            for octant, child in enumerate(current.children):
+                if child is not None:
+                    sub_cell = child_cell(current.key, octant, cell)
+                    if distance(cell_deltas(point, sub_cell)) <= radius:
+                        stack.append((child, sub_cell))
+
     def is_leaf(self, current: BeeNode) -> bool:
         """ Simple check whether or not the node is a leaf. """
         pass